@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+批量处理任务
+一次上传多个文件，生成任务后立即返回任务ID，文件在后台线程池中并发处理，
+任务状态和每个文件的结果保存在本地磁盘，同一服务的任意worker进程都可以查询
+"""
+
+import json
+import logging
+import os
+import shutil
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+FINISHED_STATES = ('completed', 'failed')
+HOSTNAME = socket.gethostname()
+
+
+class BatchQueueFull(Exception):
+    """排队中的文件数已达上限"""
+
+
+class BatchJobStore:
+    """磁盘上的任务存储：每个任务一个目录，job.json 记录状态，files/ 存放上传文件，results/ 存放处理结果"""
+    
+    def __init__(self, root: str, ttl: float = 24 * 3600):
+        self.root = root
+        self.ttl = ttl
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+        os.makedirs(self.root, exist_ok=True)
+    
+    def _job_dir(self, job_id: str) -> str:
+        return os.path.join(self.root, job_id)
+    
+    def _lock(self, job_id: str) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks.setdefault(job_id, threading.Lock())
+    
+    def _write(self, job: Dict[str, Any]) -> None:
+        # 先写临时文件再替换，其他进程读到的总是完整的状态
+        path = os.path.join(self._job_dir(job['job_id']), 'job.json')
+        temp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(job, f, ensure_ascii=False)
+        os.replace(temp_path, path)
+    
+    def create(self, user_id: str, files: List[Any], options: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """保存上传文件并登记任务；files 为带 filename 和 save(path) 的上传对象（werkzeug FileStorage）"""
+        self.purge_expired()
+        
+        job_id = uuid.uuid4().hex
+        job_dir = self._job_dir(job_id)
+        os.makedirs(os.path.join(job_dir, 'files'))
+        os.makedirs(os.path.join(job_dir, 'results'))
+        
+        entries = []
+        for index, file in enumerate(files):
+            extension = file.filename.rsplit('.', 1)[1].lower()
+            path = os.path.join(job_dir, 'files', f'{index}.{extension}')
+            file.save(path)
+            entries.append({
+                'index': index,
+                'filename': file.filename,
+                'size_bytes': os.path.getsize(path),
+                'status': 'queued'
+            })
+        
+        now = time.time()
+        job = {
+            'job_id': job_id,
+            'user_id': user_id,
+            'status': 'queued',
+            'options': options or {},
+            'created_at': now,
+            'updated_at': now,
+            'finished_at': None,
+            # 执行任务的进程，用于发现进程退出后中断的任务
+            'owner': {'host': HOSTNAME, 'pid': os.getpid()},
+            'files': entries
+        }
+        self._write(job)
+        return job
+    
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        if not job_id.isalnum():
+            return None
+        try:
+            with open(os.path.join(self._job_dir(job_id), 'job.json'), encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+    
+    def file_path(self, job: Dict[str, Any], index: int) -> str:
+        extension = job['files'][index]['filename'].rsplit('.', 1)[1].lower()
+        return os.path.join(self._job_dir(job['job_id']), 'files', f'{index}.{extension}')
+    
+    def result_path(self, job_id: str, index: int) -> str:
+        return os.path.join(self._job_dir(job_id), 'results', f'{index}.json')
+    
+    def save_result(self, job_id: str, index: int, body: bytes) -> None:
+        path = self.result_path(job_id, index)
+        with open(f'{path}.tmp', 'wb') as f:
+            f.write(body)
+        os.replace(f'{path}.tmp', path)
+    
+    def update_file(self, job_id: str, index: int, **fields: Any) -> Dict[str, Any]:
+        """更新单个文件的状态，并据此更新任务整体状态"""
+        with self._lock(job_id):
+            job = self.get(job_id)
+            job['files'][index].update(fields)
+            
+            now = time.time()
+            states = [entry['status'] for entry in job['files']]
+            if all(state in FINISHED_STATES for state in states):
+                # 全部失败时任务失败，否则视为完成（单个文件的失败见文件状态）
+                job['status'] = 'failed' if all(state == 'failed' for state in states) else 'completed'
+                job['finished_at'] = now
+            elif any(state != 'queued' for state in states):
+                job['status'] = 'running'
+            job['updated_at'] = now
+            
+            self._write(job)
+            return job
+    
+    @staticmethod
+    def _owner_alive(job: Dict[str, Any]) -> bool:
+        """执行任务的进程是否仍在运行；其他主机上的任务无法判断，视为运行中"""
+        owner = job.get('owner')
+        if not owner or owner['host'] != HOSTNAME:
+            return True
+        try:
+            os.kill(owner['pid'], 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            pass
+        return True
+    
+    def fail_orphaned(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        """执行进程已退出（worker被重启或超时终止）时，把未结束的文件标记为失败，返回最新的任务状态"""
+        if job['status'] in FINISHED_STATES or self._owner_alive(job):
+            return job
+        for entry in job['files']:
+            if entry['status'] not in FINISHED_STATES:
+                logger.warning(f"批量任务 {job['job_id']} 的执行进程已退出，文件 {entry['index']} 标记为失败")
+                job = self.update_file(
+                    job['job_id'], entry['index'], status='failed',
+                    error='处理进程已退出，任务中断，请重新提交', error_type='WorkerExited'
+                )
+                try:
+                    os.remove(self.file_path(job, entry['index']))
+                except OSError:
+                    pass
+        return job
+    
+    def fail_all_orphaned(self) -> int:
+        """启动时检查全部任务，返回标记为失败的任务数"""
+        count = 0
+        for entry in os.scandir(self.root):
+            job = self.get(entry.name) if entry.is_dir() else None
+            if job is not None and job['status'] not in FINISHED_STATES:
+                count += self.fail_orphaned(job)['status'] in FINISHED_STATES
+        return count
+    
+    def purge_expired(self) -> None:
+        """删除超过 ttl 没有更新的任务目录（包括因进程重启而中断的任务）"""
+        cutoff = time.time() - self.ttl
+        for entry in os.scandir(self.root):
+            if not entry.is_dir():
+                continue
+            job = self.get(entry.name)
+            updated_at = job['updated_at'] if job else entry.stat().st_mtime
+            if updated_at < cutoff:
+                shutil.rmtree(entry.path, ignore_errors=True)
+                with self._locks_guard:
+                    self._locks.pop(entry.name, None)
+
+
+def job_summary(job: Dict[str, Any]) -> Dict[str, Any]:
+    """对外返回的任务状态（不含用户ID）"""
+    states = [entry['status'] for entry in job['files']]
+    return {
+        'job_id': job['job_id'],
+        'status': job['status'],
+        'created_at': job['created_at'],
+        'updated_at': job['updated_at'],
+        'finished_at': job['finished_at'],
+        'total': len(states),
+        'finished': sum(state in FINISHED_STATES for state in states),
+        'succeeded': states.count('completed'),
+        'failed': states.count('failed'),
+        'files': job['files']
+    }
+
+
+# 处理单个文件的函数：(文件路径, 原始文件名, 用户ID, 任务选项) -> (结果JSON, 写入文件状态的摘要)
+FileHandler = Callable[[str, str, str, Dict[str, Any]], Tuple[bytes, Dict[str, Any]]]
+
+
+class BatchJobRunner:
+    """在有界线程池中逐文件执行任务；线程只负责调度，CPU密集的处理由 handler 交给进程池"""
+    
+    def __init__(self, store: BatchJobStore, max_workers: int = 2, max_pending: int = 500):
+        self.store = store
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._executor = None
+        self._pending = 0
+        self._lock = threading.Lock()
+    
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='batch-job')
+            return self._executor
+    
+    def reserve(self, count: int) -> None:
+        """为即将提交的文件预留排队名额，超出上限时抛出 BatchQueueFull"""
+        with self._lock:
+            if self._pending + count > self.max_pending:
+                raise BatchQueueFull()
+            self._pending += count
+    
+    def release(self, count: int = 1) -> None:
+        with self._lock:
+            self._pending -= count
+    
+    def submit(self, job: Dict[str, Any], handler: FileHandler) -> None:
+        """提交已登记任务的全部文件（名额需先经 reserve 预留）"""
+        executor = self._get_executor()
+        for entry in job['files']:
+            executor.submit(self._run_file, job, entry['index'], handler)
+    
+    def _run_file(self, job: Dict[str, Any], index: int, handler: FileHandler) -> None:
+        job_id = job['job_id']
+        path = self.store.file_path(job, index)
+        started = time.perf_counter()
+        try:
+            self.store.update_file(job_id, index, status='processing')
+            body, summary = handler(path, job['files'][index]['filename'], job['user_id'], job['options'])
+            self.store.save_result(job_id, index, body)
+            self.store.update_file(
+                job_id, index, status='completed',
+                processing_ms=round((time.perf_counter() - started) * 1000, 2), **summary
+            )
+        except Exception as e:
+            logger.error(f"批量任务 {job_id} 的文件 {index} 处理失败: {str(e)}")
+            self.store.update_file(
+                job_id, index, status='failed', error=str(e), error_type=type(e).__name__,
+                processing_ms=round((time.perf_counter() - started) * 1000, 2)
+            )
+        finally:
+            self.release()
+            # 处理完成后上传文件不再需要
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+    
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {'workers': self.max_workers, 'pending_files': self._pending, 'max_pending': self.max_pending}
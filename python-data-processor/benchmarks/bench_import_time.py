@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+启动耗时基准
+用 python -X importtime 多次测量 import app 的耗时，列出 app 直接导入的模块中最慢的几个，
+并检查认证、Excel解析等按需加载的模块没有在导入时被加载；再测量预热（WARMUP_MODE=blocking）耗时
+
+用法: python benchmarks/bench_import_time.py [--runs 5] [--top 10] [--budget-ms 毫秒] [--output 结果.json]
+
+超出 --budget-ms 或按需加载的模块在导入时被加载时退出码为1。
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 只在处理相应请求时才需要，不应在 import app 时加载
+DEFERRED_MODULES = ('jwt', 'requests', 'openpyxl')
+
+CHILD_ENV = {**os.environ, 'PROCESS_POOL_WORKERS': '0', 'PYTHONDONTWRITEBYTECODE': '1'}
+
+
+def parse_importtime(stderr):
+    """解析 -X importtime 输出，返回 [(模块, 嵌套深度, 自身微秒, 累计微秒)]"""
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        timing, name = line[len('import time:'):].rsplit('|', 1)
+        self_us, cumulative_us = (int(value) for value in timing.split('|'))
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        entries.append((name.strip(), depth, self_us, cumulative_us))
+    return entries
+
+
+def measure_import():
+    completed = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import app'],
+                               capture_output=True, text=True, cwd=SERVICE_DIR, env=CHILD_ENV, check=True)
+    entries = parse_importtime(completed.stderr)
+    app_index = next(i for i, entry in enumerate(entries) if entry[0] == 'app' and entry[1] == 0)
+    # app 的直接依赖：上一个顶层条目（如 site）之后、app 之前深度为1的条目
+    start = max((i for i, entry in enumerate(entries[:app_index]) if entry[1] == 0), default=-1) + 1
+    app_entry = entries[app_index]
+    direct = [entry for entry in entries[start:app_index] if entry[1] == 1]
+    return app_entry[3], {name: cumulative for name, _, _, cumulative in direct}
+
+
+def loaded_deferred_modules():
+    code = ('import json, sys, app; '
+            f'print(json.dumps([m for m in {DEFERRED_MODULES!r} if m in sys.modules]))')
+    completed = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True,
+                               cwd=SERVICE_DIR, env=CHILD_ENV, check=True)
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def measure_warm_up():
+    code = ('import json, app; app.warm_up.mode = "blocking"; app.warm_up.start(); '
+            'print(json.dumps(app.warm_up.snapshot()))')
+    completed = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True,
+                               cwd=SERVICE_DIR, env=CHILD_ENV, check=True)
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='import app 耗时基准')
+    parser.add_argument('--runs', type=int, default=5, help='测量次数，取中位数')
+    parser.add_argument('--top', type=int, default=10, help='列出最慢的直接依赖数')
+    parser.add_argument('--budget-ms', type=float, help='导入耗时上限（毫秒）')
+    parser.add_argument('--output', help='结果写入JSON文件')
+    args = parser.parse_args()
+
+    totals, modules = [], {}
+    for _ in range(args.runs):
+        total, direct = measure_import()
+        totals.append(total)
+        for name, cumulative in direct.items():
+            modules.setdefault(name, []).append(cumulative)
+    import_ms = statistics.median(totals) / 1000
+    module_ms = {name: statistics.median(values) / 1000 for name, values in modules.items()}
+    deferred = loaded_deferred_modules()
+    warm_up = measure_warm_up()
+
+    print(f'import app: {import_ms:.1f}ms（{args.runs} 次中位数，最快 {min(totals) / 1000:.1f}ms）')
+    print(f"{'模块':<32} {'累计(ms)':>10}")
+    for name, elapsed in sorted(module_ms.items(), key=lambda item: -item[1])[:args.top]:
+        print(f'{name:<32} {elapsed:>10.1f}')
+    print(f"预热: {warm_up['timings']}")
+
+    failures = []
+    if deferred:
+        failures.append(f"按需加载的模块在导入时被加载: {', '.join(deferred)}")
+    if args.budget_ms is not None and import_ms > args.budget_ms:
+        failures.append(f'导入耗时 {import_ms:.1f}ms 超出上限 {args.budget_ms:g}ms')
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({
+                'python': sys.version.split()[0],
+                'import_ms': round(import_ms, 1),
+                'modules_ms': {name: round(elapsed, 1) for name, elapsed in module_ms.items()},
+                'deferred_loaded': deferred,
+                'warm_up': warm_up
+            }, f, ensure_ascii=False, indent=2)
+
+    for failure in failures:
+        print(f'❌ {failure}')
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+成绩记录内存占用基准
+对比每条 (学生, 科目) 记录一个字典的表示与列式紧凑批（GradeRecordBatch）的每条记录字节数，
+以及两者编码为JSON的耗时，并校验JSON输出一致
+
+用法: python benchmarks/bench_record_memory.py [行数 ...]
+"""
+
+import json
+import os
+import sys
+import time
+import tracemalloc
+import logging
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import ExcelFieldMapper, frame_to_records  # noqa: E402
+from bench_wide_format import make_wide_frame  # noqa: E402
+from grade_batch import GradeRecordBatch  # noqa: E402
+
+logging.getLogger('app').setLevel(logging.WARNING)
+
+
+def traced_bytes(func, *args):
+    """func 返回的对象仍然存活时新分配的字节数"""
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    before = tracemalloc.get_traced_memory()[0]
+    result = func(*args)
+    allocated = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return result, allocated
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1_000, 10_000, 50_000]
+    mapper = ExcelFieldMapper()
+
+    print(f"{'行数':>8} {'记录数':>10} {'字典(B/条)':>12} {'批(B/条)':>10} {'内存比':>8} "
+          f"{'字典JSON(s)':>12} {'批JSON(s)':>10}")
+    for rows in sizes:
+        df = make_wide_frame(rows)
+        frame = mapper.build_wide_frame(df, mapper.map_columns(df))
+        count = len(frame)
+
+        records, records_bytes = traced_bytes(frame_to_records, frame)
+        batch = GradeRecordBatch.from_frame(frame)
+        batch_bytes = batch.memory_bytes()
+
+        expected, dict_time = timed(lambda: json.dumps(records, sort_keys=True))
+        encoded, batch_time = timed(batch.json_records, json.dumps)
+        if '[' + ', '.join(encoded) + ']' != expected:
+            print(f"❌ {rows} 行时两种表示的JSON输出不一致")
+            sys.exit(1)
+
+        print(f"{rows:>8} {count:>10} {records_bytes / count:>12.0f} {batch_bytes / count:>10.0f} "
+              f"{records_bytes / batch_bytes:>7.1f}x {dict_time:>12.3f} {batch_time:>10.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+XLSX转CSV转换器基准
+对比 scripts/xlsx-to-csv-converter.py 的 openpyxl 路径与标准库 iterparse 路径：
+每个转换器在独立子进程中运行，记录耗时和转换期间新增的峰值RSS，并校验两者输出的CSV一致
+（合成表的总分列为带缓存计算结果的公式，两者都应输出计算结果）
+
+用法: python benchmarks/bench_xlsx_converter.py [--rows 70000] [--output 结果.json]
+"""
+
+import argparse
+import csv
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from synthetic import generate  # noqa: E402
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+CONVERTER = os.path.join(REPO_DIR, 'scripts', 'xlsx-to-csv-converter.py')
+CONVERTERS = ('openpyxl', 'xml')
+
+# 子进程：按路径加载转换器，以导入完成后的RSS为基线，转换后读取峰值RSS
+# （用 /proc 的 VmRSS / VmHWM 而不是 ru_maxrss：后者在 fork+exec 后保留父进程的峰值）
+CHILD_CODE = '''
+import importlib.util, json, sys, time
+def status_kb(field):
+    with open('/proc/self/status') as f:
+        return next(int(line.split()[1]) for line in f if line.startswith(field + ':'))
+spec = importlib.util.spec_from_file_location('converter', sys.argv[1])
+converter = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(converter)
+baseline = status_kb('VmRSS')
+start = time.perf_counter()
+outputs = converter.convert_workbook(sys.argv[3], sys.argv[4], sys.argv[2])
+elapsed = time.perf_counter() - start
+print(json.dumps({'seconds': elapsed, 'peak_rss_mb': (status_kb('VmHWM') - baseline) / 1024, 'paths': [str(path) for path, _ in outputs]}))
+'''
+
+
+def run_converter(name, xlsx_path, csv_path):
+    completed = subprocess.run([sys.executable, '-c', CHILD_CODE, CONVERTER, name, xlsx_path, csv_path],
+                               capture_output=True, text=True, check=True)
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    if not result['paths']:
+        raise RuntimeError(f'{name} 转换失败: {completed.stdout}')
+    return result
+
+
+def read_rows(path):
+    """读出CSV各行，去掉行尾的空字段（openpyxl 按工作表尺寸补齐空列）"""
+    with open(path, encoding='utf-8', newline='') as f:
+        rows = []
+        for row in csv.reader(f):
+            while row and row[-1] == '':
+                row.pop()
+            rows.append(row)
+    while rows and not rows[-1]:
+        rows.pop()
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description='XLSX转CSV转换器基准')
+    parser.add_argument('--rows', type=int, default=70_000, help='合成成绩表行数（15列，默认约100万个单元格）')
+    parser.add_argument('--output', help='结果写入JSON文件')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        xlsx_path = os.path.join(workdir, '成绩.xlsx')
+        info = generate(xlsx_path, args.rows, formula_totals=True)
+        cells = info['rows'] * info['columns']
+        print(f"{info['rows']} 行 × {info['columns']} 列（{cells} 个单元格），{info['bytes'] / 1e6:.1f}MB")
+
+        results, outputs = {}, {}
+        for name in CONVERTERS:
+            result = run_converter(name, xlsx_path, os.path.join(workdir, f'{name}.csv'))
+            outputs[name] = [read_rows(path) for path in result['paths']]
+            results[name] = {
+                'seconds': round(result['seconds'], 3),
+                'cells_per_second': round(cells / result['seconds']),
+                'peak_rss_mb': round(result['peak_rss_mb'], 1)
+            }
+
+    print(f"{'转换器':<10} {'耗时(s)':>10} {'单元格/秒':>12} {'峰值RSS(MB)':>12}")
+    for name, result in results.items():
+        print(f"{name:<10} {result['seconds']:>10.2f} {result['cells_per_second']:>12} {result['peak_rss_mb']:>12.1f}")
+
+    identical = outputs['openpyxl'] == outputs['xml']
+    print('✅ 两个转换器输出一致' if identical else '❌ 两个转换器输出不一致')
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({
+                'python': sys.version.split()[0],
+                'rows': info['rows'],
+                'columns': info['columns'],
+                'bytes': info['bytes'],
+                'converters': results,
+                'identical': identical
+            }, f, ensure_ascii=False, indent=2)
+
+    if not identical:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
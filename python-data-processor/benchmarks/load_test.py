@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+/process 压测脚本
+以固定并发向运行中的服务反复上传同一份成绩表，统计吞吐量（请求/秒）和延迟分位数
+
+用法:
+    gunicorn -c gunicorn.conf.py &
+    python benchmarks/load_test.py --token <access token> [--rows 2000] [--concurrency 8] [--duration 30]
+    python benchmarks/load_test.py --file 成绩.xlsx --token <access token>
+
+未指定 --file 时生成一份宽格式样例工作簿；token 也可通过环境变量 LOAD_TEST_TOKEN 传入。
+服务默认开启结果缓存，重复上传同一文件会直接命中，压测解析性能时加 --no-cache。
+"""
+
+import argparse
+import io
+import os
+import sys
+import threading
+import time
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_wide_format import make_wide_frame  # noqa: E402
+
+
+def sample_workbook(rows: int) -> bytes:
+    """生成宽格式样例工作簿"""
+    buffer = io.BytesIO()
+    make_wide_frame(rows).to_excel(buffer, index=False)
+    return buffer.getvalue()
+
+
+def percentile(values, pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+def run_worker(url, token, payload, filename, deadline, latencies, failures, lock):
+    session = requests.Session()
+    headers = {'Authorization': f'Bearer {token}'}
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            response = session.post(url, headers=headers, files={'file': (filename, payload)}, timeout=300)
+            ok = response.status_code == 200
+            status = response.status_code
+        except requests.RequestException as e:
+            ok, status = False, type(e).__name__
+        elapsed = time.perf_counter() - start
+
+        with lock:
+            if ok:
+                latencies.append(elapsed)
+            else:
+                failures[status] = failures.get(status, 0) + 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description='/process 压测')
+    parser.add_argument('--url', default='http://localhost:5000', help='服务地址')
+    parser.add_argument('--token', default=os.getenv('LOAD_TEST_TOKEN'), help='Supabase access token')
+    parser.add_argument('--file', help='上传的工作簿，缺省时生成样例')
+    parser.add_argument('--rows', type=int, default=2000, help='样例工作簿行数')
+    parser.add_argument('--concurrency', type=int, default=8, help='并发请求数')
+    parser.add_argument('--duration', type=float, default=30, help='压测时长（秒）')
+    parser.add_argument('--no-cache', action='store_true', help='请求带 cache=0，绕过结果缓存')
+    args = parser.parse_args()
+
+    if not args.token:
+        parser.error('需要 --token 或环境变量 LOAD_TEST_TOKEN')
+
+    if args.file:
+        with open(args.file, 'rb') as f:
+            payload = f.read()
+        filename = os.path.basename(args.file)
+    else:
+        payload = sample_workbook(args.rows)
+        filename = f'sample_{args.rows}.xlsx'
+
+    url = args.url.rstrip('/') + '/process' + ('?cache=0' if args.no_cache else '')
+    print(f"目标: {url}  文件: {filename} ({len(payload) / 1024:.0f}KB)  并发: {args.concurrency}  时长: {args.duration}s")
+
+    latencies, failures, lock = [], {}, threading.Lock()
+    started = time.perf_counter()
+    deadline = started + args.duration
+    workers = [
+        threading.Thread(target=run_worker, args=(url, args.token, payload, filename, deadline, latencies, failures, lock))
+        for _ in range(args.concurrency)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    wall = time.perf_counter() - started
+
+    print(f"成功请求: {len(latencies)}  失败: {sum(failures.values())} {failures or ''}")
+    if latencies:
+        print(f"吞吐量: {len(latencies) / wall:.2f} 请求/秒")
+        print(f"延迟(s): 平均 {sum(latencies) / len(latencies):.3f}  p50 {percentile(latencies, 0.5):.3f}  "
+              f"p95 {percentile(latencies, 0.95):.3f}  p99 {percentile(latencies, 0.99):.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+处理流程基准套件
+用合成成绩文件（见 synthetic.py）覆盖宽/长格式、XLSX/XLS/CSV、UTF-8/GBK、噪声表头、合并表头和多工作表，
+逐阶段计时（读取、字段映射、转换、验证、紧凑批、JSON/Arrow编码），再通过Flask测试客户端请求 /analyze（采样与 ?full=1）和 /process；
+每个场景在独立子进程中运行，记录吞吐量（行/秒）和峰值RSS，结果写为JSON，可与其他提交的结果对比
+
+用法:
+    python benchmarks/run_benchmarks.py [--preset quick|full] [--only 场景名 ...] [--repeat 3] [--output 结果.json]
+    python benchmarks/run_benchmarks.py --compare benchmarks/results/<旧提交>.json [--threshold 0.2]
+    python benchmarks/run_benchmarks.py --list
+
+合成文件缓存在 --fixtures-dir（默认系统临时目录下的 edu-bench-fixtures），相同参数只生成一次。
+--compare 时任一场景的阶段耗时、端点耗时或峰值RSS超过基线的 (1 + threshold) 倍即视为退化，退出码为1。
+"""
+
+import argparse
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+SERVICE_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, SERVICE_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+DEFAULT_FIXTURES_DIR = os.path.join(tempfile.gettempdir(), 'edu-bench-fixtures')
+DEFAULT_RESULTS_DIR = os.path.join(BENCH_DIR, 'results')
+MIN_REGRESSION_MS = 5  # 差值低于该毫秒数的变化视为噪声
+MIN_REGRESSION_MB = 5
+
+
+def scenario(name, rows, fmt='xlsx', layout='wide', encoding='utf-8', noisy_headers=False,
+             merged_header=False, sheets=1):
+    return {
+        'name': name, 'rows': rows, 'format': fmt, 'layout': layout, 'encoding': encoding,
+        'noisy_headers': noisy_headers, 'merged_header': merged_header, 'sheets': sheets
+    }
+
+
+QUICK_SCENARIOS = [
+    scenario('wide-xlsx-1k', 1_000),
+    scenario('wide-xlsx-10k', 10_000),
+    scenario('wide-csv-utf8-10k', 10_000, 'csv'),
+    scenario('wide-csv-gbk-10k', 10_000, 'csv', encoding='gbk'),
+    scenario('wide-xls-10k', 10_000, 'xls'),
+    scenario('long-xlsx-10k', 10_000, layout='long'),
+    scenario('long-csv-10k', 10_000, 'csv', layout='long'),
+    scenario('noisy-headers-xlsx-10k', 10_000, noisy_headers=True),
+    scenario('merged-header-xlsx-10k', 10_000, merged_header=True),
+    scenario('merged-header-csv-gbk-10k', 10_000, 'csv', encoding='gbk', merged_header=True),
+    scenario('multi-sheet-xlsx-10k', 10_000, sheets=10),
+]
+
+FULL_SCENARIOS = QUICK_SCENARIOS + [
+    scenario('wide-xlsx-100k', 100_000),
+    scenario('wide-csv-gbk-100k', 100_000, 'csv', encoding='gbk'),
+    scenario('long-csv-100k', 100_000, 'csv', layout='long'),
+    scenario('multi-sheet-xlsx-100k', 100_000, sheets=20),
+    scenario('wide-xlsx-500k', 500_000),
+    scenario('wide-csv-utf8-500k', 500_000, 'csv'),
+]
+
+PRESETS = {'quick': QUICK_SCENARIOS, 'full': FULL_SCENARIOS}
+
+
+def fixture_path(spec, fixtures_dir, seed):
+    parts = [spec['layout'], str(spec['rows'])]
+    if spec['format'] == 'csv':
+        parts.append(spec['encoding'])
+    if spec['noisy_headers']:
+        parts.append('noisy')
+    if spec['merged_header']:
+        parts.append('merged')
+    if spec['sheets'] > 1:
+        parts.append(f"{spec['sheets']}sheets")
+    parts.append(f'seed{seed}')
+    return os.path.join(fixtures_dir, '-'.join(parts) + '.' + spec['format'])
+
+
+def ensure_fixture(spec, fixtures_dir, seed):
+    """生成（或复用已生成的）合成文件，返回 (路径, 生成耗时秒数)"""
+    from synthetic import generate
+
+    path = fixture_path(spec, fixtures_dir, seed)
+    if os.path.exists(path):
+        return path, 0.0
+    os.makedirs(fixtures_dir, exist_ok=True)
+    start = time.perf_counter()
+    partial = path + '.partial'
+    generate(partial, spec['rows'], spec['layout'], spec['format'], spec['encoding'],
+             spec['noisy_headers'], spec['merged_header'], spec['sheets'], seed)
+    os.replace(partial, path)
+    return path, time.perf_counter() - start
+
+
+def peak_rss_mb():
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 以KB为单位，macOS 以字节为单位
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def timed_ms(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, round((time.perf_counter() - start) * 1000, 2)
+
+
+def run_worker(spec, path, repeat):
+    """在子进程中运行一个场景：先逐阶段计时（取各轮最小值），再请求各端点"""
+    # 在导入app之前配置：进程池和结果缓存会干扰计时，文件大小上限按合成文件放开
+    work_dir = tempfile.mkdtemp(prefix='edu-bench-')
+    os.environ.update({
+        'PROCESS_POOL_WORKERS': '0',
+        'RESULT_CACHE_SIZE': '0',
+        'MAX_FILE_SIZE': str(max(os.path.getsize(path) * 2, 10 * 1024 * 1024)),
+        'DELTA_STORE_PATH': os.path.join(work_dir, 'fingerprints.sqlite3'),
+        'BATCH_JOB_DIR': os.path.join(work_dir, 'batch-jobs'),
+    })
+    import importlib
+    import logging
+    logging.disable(logging.WARNING)
+
+    service, import_ms = timed_ms(importlib.import_module, 'app')
+    rss_after_import = peak_rss_mb()
+    filename = os.path.basename(path)
+    # 多工作表时逐个工作表处理，各阶段耗时累加
+    sheet_names = service.list_sheet_names(path, filename) if spec['sheets'] > 1 else [0]
+    stages = {}
+    pipeline = {}
+    for _ in range(repeat):
+        timings, batches = {}, []
+        pipeline = {'rows': 0, 'records': 0, 'sheets': len(sheet_names), 'mapped_columns': 0, 'data_structures': []}
+        for sheet_name in sheet_names:
+            result = service.run_processing_task(path, filename, sheet_name=sheet_name)
+            for stage, elapsed in result['timings'].items():
+                timings[stage] = timings.get(stage, 0) + elapsed
+            if 'batch' in result:
+                batches.append(result['batch'])
+            pipeline['rows'] += result['rows']
+            pipeline['records'] += len(result['batch']) if 'batch' in result else 0
+            pipeline['mapped_columns'] = max(pipeline['mapped_columns'], len(result['column_mapping']))
+            if result['column_mapping'] and result['data_structure'] not in pipeline['data_structures']:
+                pipeline['data_structures'].append(result['data_structure'])
+        with service.app.app_context():
+            _, timings['records_json_ms'] = timed_ms(service.records_to_json, batches)
+            if service.PYARROW_AVAILABLE and batches:
+                _, timings['records_arrow_ms'] = timed_ms(service.records_to_arrow, batches)
+        for stage, elapsed in timings.items():
+            stages[stage] = round(min(stages.get(stage, elapsed), elapsed), 2)
+    rss_after_pipeline = peak_rss_mb()
+
+    # 端点：认证替换为固定用户，其余与线上请求相同
+    service.authenticate_user = lambda authorization_header: 'benchmark'
+    client = service.app.test_client()
+    with open(path, 'rb') as f:
+        content = f.read()
+    query = '?cache=0&sheets=all' if spec['sheets'] > 1 else '?cache=0'
+    endpoints = {'analyze': '/analyze' + query, 'analyze_full': '/analyze' + query + '&full=1', 'process': '/process' + query}
+    if service.PYARROW_AVAILABLE:
+        endpoints['process_arrow'] = '/process' + query + '&format=arrow'
+    results = {}
+    for name, url in endpoints.items():
+        best = None
+        for _ in range(repeat):
+            response, elapsed = timed_ms(
+                client.post, url, headers={'Authorization': 'Bearer benchmark'},
+                data={'file': (io.BytesIO(content), filename)}, content_type='multipart/form-data'
+            )
+            if best is None or elapsed < best['ms']:
+                best = {'status': response.status_code, 'ms': elapsed, 'bytes': len(response.get_data())}
+        results[name] = best
+
+    pipeline_ms = round(sum(stages.values()), 2)
+    return {
+        **pipeline,
+        'import_ms': import_ms,
+        'stages_ms': stages,
+        'pipeline_ms': pipeline_ms,
+        'rows_per_second': round(pipeline['rows'] / (pipeline_ms / 1000)) if pipeline_ms else None,
+        'endpoints': results,
+        'rss_after_import_mb': rss_after_import,
+        'rss_after_pipeline_mb': rss_after_pipeline,
+        'peak_rss_mb': peak_rss_mb(),
+    }
+
+
+def run_scenario(spec, fixtures_dir, seed, repeat):
+    # 生成器（及其依赖的pandas）只在父进程中导入，子进程的 import_ms 才是完整的 import app 耗时
+    from synthetic import xlwt
+
+    if spec['format'] == 'xls' and xlwt is None:
+        return {'spec': spec, 'skipped': '生成 .xls 需要安装 xlwt'}
+    path, generate_seconds = ensure_fixture(spec, fixtures_dir, seed)
+    completed = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--worker', json.dumps(spec), path, '--repeat', str(repeat)],
+        capture_output=True, text=True, cwd=SERVICE_DIR
+    )
+    if completed.returncode != 0:
+        error = completed.stderr.strip().splitlines()
+        return {'spec': spec, 'error': error[-1] if error else f'退出码 {completed.returncode}'}
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    return {
+        'spec': spec,
+        'file_bytes': os.path.getsize(path),
+        'generate_seconds': round(generate_seconds, 2),
+        **result
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=SERVICE_DIR, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment():
+    import numpy
+    import openpyxl
+    import pandas
+    versions = {'python': platform.python_version(), 'pandas': pandas.__version__,
+                'numpy': numpy.__version__, 'openpyxl': openpyxl.__version__}
+    try:
+        import pyarrow
+        versions['pyarrow'] = pyarrow.__version__
+    except ImportError:
+        versions['pyarrow'] = None
+    return {
+        'commit': git_commit(),
+        'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'versions': versions,
+    }
+
+
+def comparable_metrics(result):
+    """参与对比的指标：(名称, 值, 单位)"""
+    if 'import_ms' in result:
+        yield 'import_ms', result['import_ms'], 'ms'
+    for stage, value in result.get('stages_ms', {}).items():
+        yield f'stage.{stage}', value, 'ms'
+    if 'pipeline_ms' in result:
+        yield 'pipeline_ms', result['pipeline_ms'], 'ms'
+    for name, endpoint in result.get('endpoints', {}).items():
+        yield f'endpoint.{name}', endpoint['ms'], 'ms'
+    if 'peak_rss_mb' in result:
+        yield 'peak_rss_mb', result['peak_rss_mb'], 'MB'
+
+
+def compare(current, baseline, threshold):
+    """对比两次结果，打印变化并返回退化项列表"""
+    regressions = []
+    print(f"\n与基线 {baseline['meta'].get('commit')} 对比（阈值 {threshold:.0%}）")
+    for name, result in current['scenarios'].items():
+        base = baseline['scenarios'].get(name)
+        if base is None or 'stages_ms' not in base or 'stages_ms' not in result:
+            continue
+        base_metrics = {metric: value for metric, value, _ in comparable_metrics(base)}
+        for metric, value, unit in comparable_metrics(result):
+            before = base_metrics.get(metric)
+            if not before:
+                continue
+            ratio = value / before
+            floor = MIN_REGRESSION_MB if unit == 'MB' else MIN_REGRESSION_MS
+            regressed = ratio > 1 + threshold and value - before > floor
+            if regressed:
+                regressions.append((name, metric, before, value))
+            if regressed or ratio < 1 - threshold:
+                marker = '❌' if regressed else '✅'
+                print(f'  {marker} {name} {metric}: {before:g}{unit} -> {value:g}{unit} ({ratio - 1:+.0%})')
+        for endpoint, info in result.get('endpoints', {}).items():
+            before = base.get('endpoints', {}).get(endpoint, {}).get('status')
+            if before is not None and before != info['status']:
+                print(f"  ⚠️  {name} {endpoint}: 状态码 {before} -> {info['status']}")
+    if not regressions:
+        print('  没有超过阈值的退化')
+    return regressions
+
+
+def print_summary(results):
+    print(f"{'场景':<28} {'行数':>8} {'记录数':>9} {'映射列':>6} {'流程(ms)':>10} {'行/秒':>9} "
+          f"{'/process(ms)':>13} {'状态':>5} {'峰值RSS(MB)':>12}")
+    for name, result in results.items():
+        if 'stages_ms' not in result:
+            print(f"{name:<28} {result.get('skipped') or '失败: ' + result.get('error', '')}")
+            continue
+        process = result['endpoints']['process']
+        print(f"{name:<28} {result['rows']:>8} {result['records']:>9} {result['mapped_columns']:>6} "
+              f"{result['pipeline_ms']:>10.1f} {result['rows_per_second'] or 0:>9} {process['ms']:>13.1f} "
+              f"{process['status']:>5} {result['peak_rss_mb']:>12.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='处理流程基准套件')
+    parser.add_argument('--preset', choices=sorted(PRESETS), default='quick', help='场景集合')
+    parser.add_argument('--only', nargs='+', metavar='场景名', help='只运行指定场景')
+    parser.add_argument('--repeat', type=int, default=3, help='每个场景重复次数，取最小耗时')
+    parser.add_argument('--seed', type=int, default=42, help='合成数据的随机种子')
+    parser.add_argument('--fixtures-dir', default=DEFAULT_FIXTURES_DIR, help='合成文件缓存目录')
+    parser.add_argument('--output', help='结果文件，默认 benchmarks/results/<提交>.json')
+    parser.add_argument('--compare', metavar='基线.json', help='与之前的结果对比')
+    parser.add_argument('--threshold', type=float, default=0.2, help='判定退化的相对增幅')
+    parser.add_argument('--list', action='store_true', help='列出场景后退出')
+    parser.add_argument('--worker', nargs=2, metavar=('场景', '文件'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        spec, path = args.worker
+        print(json.dumps(run_worker(json.loads(spec), path, args.repeat)))
+        return
+
+    scenarios = PRESETS[args.preset]
+    if args.only:
+        known = {spec['name']: spec for spec in FULL_SCENARIOS}
+        unknown = [name for name in args.only if name not in known]
+        if unknown:
+            parser.error(f"未知的场景: {', '.join(unknown)}")
+        scenarios = [known[name] for name in args.only]
+    if args.list:
+        for spec in scenarios:
+            print(spec['name'])
+        return
+
+    meta = {**environment(), 'preset': args.preset, 'repeat': args.repeat, 'seed': args.seed}
+    results = {}
+    for spec in scenarios:
+        print(f"运行 {spec['name']} ...", file=sys.stderr)
+        results[spec['name']] = run_scenario(spec, args.fixtures_dir, args.seed, args.repeat)
+    report = {'meta': meta, 'scenarios': results}
+
+    output = args.output or os.path.join(DEFAULT_RESULTS_DIR, f"{meta['commit'] or 'local'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    print_summary(results)
+    print(f'\n结果已写入 {output}')
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        if compare(report, baseline, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+合成成绩文件生成器
+按学校导出的成绩表的常见形态生成可复现的测试文件：宽格式（每科一列）或长格式（每行一个科目），
+XLSX / XLS / CSV（UTF-8 或 GBK），可选"语文成绩(满分150)"一类的噪声表头、两行合并表头、按班级拆分的多个工作表和填写说明页
+
+用法: python benchmarks/synthetic.py 输出文件 [--rows N] [--layout wide|long] [--encoding utf-8|gbk]
+                                      [--noisy-headers] [--merged-header] [--sheets N] [--seed N] [--formula-totals]
+"""
+
+import argparse
+import os
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+try:
+    import xlwt  # 仅写 .xls 时需要
+except ImportError:
+    xlwt = None
+
+# (科目, 满分)
+SUBJECTS = [('语文', 150), ('数学', 150), ('英语', 150), ('物理', 100), ('化学', 100),
+            ('生物', 100), ('政治', 100), ('历史', 100), ('地理', 100)]
+SURNAMES = '王李张刘陈杨黄赵吴周徐孙马朱胡郭何高林罗'
+GIVEN_NAMES = '子涵浩宇欣怡梓轩一诺雨桐思远佳琪俊杰晨曦若汐明轩语嫣'
+BASE_HEADERS = ['学校名称', '学校代码', '学号', '姓名', '班级']
+INSTRUCTIONS = [
+    ['填写说明'],
+    ['1. 每名学生一行，学号不能为空'],
+    ['2. 缺考填写"Q"或"缺考"，不要留空'],
+    ['3. 成绩保留一位小数'],
+]
+EXCEL_MAX_ROWS = {'xlsx': 1_048_576, 'xls': 65_536}
+
+
+def subject_header(subject: str, full_marks: int, variant: int) -> str:
+    """科目列的表头；variant 非零时为带满分、空格或全角括号的噪声写法"""
+    return [
+        subject,
+        f'{subject}成绩(满分{full_marks})',
+        f' {subject} ',
+        f'{subject}（{full_marks}分）',
+        f'{subject}分数',
+    ][variant % 5]
+
+
+def _noisy_scores(rng: np.random.Generator, rows: int, full_marks: int) -> np.ndarray:
+    """一位小数的成绩，约2%缺考（Q / 缺考）、1%空白、1%带"分"字"""
+    scores = (np.round(rng.normal(full_marks * 0.7, full_marks * 0.15, rows).clip(0, full_marks) * 2) / 2).astype(object)
+    noise = rng.random(rows)
+    scores[noise < 0.01] = 'Q'
+    scores[(noise >= 0.01) & (noise < 0.02)] = '缺考'
+    scores[(noise >= 0.02) & (noise < 0.03)] = None
+    marked = (noise >= 0.03) & (noise < 0.04)
+    scores[marked] = [f'{value:g}分' for value in scores[marked]]
+    return scores
+
+
+def _students(rng: np.random.Generator, count: int, classes: int) -> pd.DataFrame:
+    surnames = rng.choice(list(SURNAMES), count)
+    given = rng.choice(list(GIVEN_NAMES), (count, 2))
+    return pd.DataFrame({
+        '学校名称': '第一实验中学',
+        '学校代码': '440301001',
+        '学号': [f'2024{i:06d}' for i in range(count)],
+        '姓名': [s + ''.join(g) for s, g in zip(surnames, given)],
+        '班级': [f'初二({i % classes + 1})班' for i in range(count)],
+    })
+
+
+def make_exam_frame(rows: int, layout: str = 'wide', noisy_headers: bool = False,
+                    classes: int = 20, seed: int = 42) -> pd.DataFrame:
+    """生成 rows 行的成绩表
+
+    宽格式每行一名学生、每科一列，另有总分；长格式每行为一名学生的一个科目（科目、成绩两列）。
+    noisy_headers 为True时科目列使用噪声表头。
+    """
+    rng = np.random.default_rng(seed)
+    if layout == 'wide':
+        df = _students(rng, rows, classes)
+        for i, (subject, full_marks) in enumerate(SUBJECTS):
+            df[subject_header(subject, full_marks, i + 1 if noisy_headers else 0)] = _noisy_scores(rng, rows, full_marks)
+        subjects = df.columns[len(BASE_HEADERS):]
+        totals = df[subjects].apply(lambda column: pd.to_numeric(column, errors='coerce')).sum(axis=1)
+        df['总分' if not noisy_headers else '总分(满分1050)'] = totals.round(1)
+        return df
+
+    if layout != 'long':
+        raise ValueError(f'未知的表格布局: {layout}')
+    students = _students(rng, -(-rows // len(SUBJECTS)), classes)
+    df = students.loc[students.index.repeat(len(SUBJECTS))].reset_index(drop=True).iloc[:rows]
+    subjects = np.tile([subject for subject, _ in SUBJECTS], len(students))[:rows]
+    full_marks = np.tile([marks for _, marks in SUBJECTS], len(students))[:rows]
+    df['科目'] = subjects
+    df['成绩' if not noisy_headers else '成绩(原始分)'] = np.where(
+        rng.random(rows) < 0.02, 'Q', np.round(full_marks * rng.uniform(0.3, 1.0, rows), 1).astype(object)
+    )
+    return df
+
+
+def header_groups(columns: List[str]) -> List[str]:
+    """合并表头第一行的分组名：基本信息列归为"基本信息"，其余为"考试成绩\""""
+    return ['基本信息' if column in BASE_HEADERS else '考试成绩' for column in columns]
+
+
+def split_sheets(df: pd.DataFrame, sheets: int) -> Dict[str, pd.DataFrame]:
+    """按班级把表拆为 sheets 个工作表（工作表名为各自第一个班级）"""
+    if sheets <= 1:
+        return {'成绩': df}
+    classes = list(dict.fromkeys(df['班级']))
+    groups = np.array_split(np.array(classes, dtype=object), sheets)
+    result = {}
+    for group in groups:
+        if len(group):
+            result[str(group[0])[:31]] = df[df['班级'].isin(group)]
+    return result
+
+
+def _group_spans(groups: List[str]) -> List[tuple]:
+    """连续相同分组的 (名称, 起始列, 结束列)，列号从1开始"""
+    spans, start = [], 0
+    for i in range(1, len(groups) + 1):
+        if i == len(groups) or groups[i] != groups[start]:
+            spans.append((groups[start], start + 1, i))
+            start = i
+    return spans
+
+
+def _excel_value(value: Any) -> Any:
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return None
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def _cache_formula_values(path: str, cached: List[Dict[str, Any]]) -> None:
+    """把公式的计算结果写入各工作表XML的 <v>，与Excel重新计算后保存的文件一样（openpyxl 只写公式）"""
+    import re
+    import shutil
+    import zipfile
+
+    pattern = re.compile(r'<c r="([A-Z]+[0-9]+)"><f>(.*?)</f><v\s*/></c>')
+    temp_path = f'{path}.tmp'
+    with zipfile.ZipFile(path) as source, zipfile.ZipFile(temp_path, 'w', zipfile.ZIP_DEFLATED) as target:
+        for item in source.infolist():
+            data = source.read(item.filename)
+            match = re.fullmatch(r'xl/worksheets/sheet(\d+)\.xml', item.filename)
+            if match and int(match.group(1)) <= len(cached):
+                values = cached[int(match.group(1)) - 1]
+                data = pattern.sub(
+                    lambda cell: f'<c r="{cell.group(1)}"><f>{cell.group(2)}</f><v>{values[cell.group(1)]:g}</v></c>'
+                    if cell.group(1) in values else cell.group(0),
+                    data.decode('utf-8')
+                ).encode('utf-8')
+            target.writestr(item, data)
+    shutil.move(temp_path, path)
+
+
+def _write_xlsx(path: str, sheets: Dict[str, pd.DataFrame], merged_header: bool, instructions: bool,
+                formula_totals: bool = False) -> None:
+    from openpyxl import Workbook
+    from openpyxl.utils import get_column_letter
+
+    # 只写模式不支持合并单元格，只在需要合并表头时使用普通模式
+    workbook = Workbook(write_only=not merged_header)
+    if merged_header:
+        workbook.remove(workbook.active)
+    cached = []
+    for name, df in sheets.items():
+        sheet = workbook.create_sheet(name)
+        columns = list(df.columns)
+        if merged_header:
+            groups = header_groups(columns)
+            sheet.append(groups)
+            for group, first, last in _group_spans(groups):
+                if last > first:
+                    sheet.merge_cells(start_row=1, start_column=first, end_row=1, end_column=last)
+        sheet.append(columns)
+        # 总分列写为对各科求和的公式（宽格式最后一列）
+        total_column = len(columns) if formula_totals and columns[-1].startswith('总分') else None
+        first_row = 2 + merged_header
+        values = {}
+        for i, row in enumerate(df.itertuples(index=False, name=None), start=first_row):
+            cells = [_excel_value(value) for value in row]
+            if total_column:
+                reference = f'{get_column_letter(total_column)}{i}'
+                values[reference] = cells[-1]
+                cells[-1] = (f'=SUM({get_column_letter(len(BASE_HEADERS) + 1)}{i}:'
+                             f'{get_column_letter(total_column - 1)}{i})')
+            sheet.append(cells)
+        cached.append(values)
+    if instructions:
+        sheet = workbook.create_sheet('填写说明')
+        for row in INSTRUCTIONS:
+            sheet.append(row)
+    workbook.save(path)
+    if formula_totals:
+        _cache_formula_values(path, cached)
+
+
+def _write_xls(path: str, sheets: Dict[str, pd.DataFrame], merged_header: bool, instructions: bool) -> None:
+    if xlwt is None:
+        raise RuntimeError('生成 .xls 需要安装 xlwt')
+    workbook = xlwt.Workbook(encoding='utf-8')
+    for name, df in sheets.items():
+        sheet = workbook.add_sheet(name)
+        columns = list(df.columns)
+        offset = 0
+        if merged_header:
+            for group, first, last in _group_spans(header_groups(columns)):
+                sheet.write_merge(0, 0, first - 1, last - 1, group)
+            offset = 1
+        for j, column in enumerate(columns):
+            sheet.write(offset, j, column)
+        for i, row in enumerate(df.itertuples(index=False, name=None), start=offset + 1):
+            for j, value in enumerate(row):
+                value = _excel_value(value)
+                if value is not None:
+                    sheet.write(i, j, value)
+    if instructions:
+        sheet = workbook.add_sheet('填写说明')
+        for i, row in enumerate(INSTRUCTIONS):
+            sheet.write(i, 0, row[0])
+    workbook.save(path)
+
+
+def _write_csv(path: str, df: pd.DataFrame, encoding: str, merged_header: bool) -> None:
+    # CSV没有合并单元格，合并表头写成首行只在分组开头有值的形式（与Excel另存为CSV一致）
+    with open(path, 'w', encoding=encoding, newline='') as f:
+        if merged_header:
+            groups = header_groups(list(df.columns))
+            first_row = [group if i == 0 or groups[i - 1] != group else '' for i, group in enumerate(groups)]
+            f.write(','.join(first_row) + '\n')
+        df.to_csv(f, index=False)
+
+
+def write_exam_file(path: str, df: pd.DataFrame, file_format: Optional[str] = None, encoding: str = 'utf-8',
+                    merged_header: bool = False, sheets: int = 1, instructions: Optional[bool] = None,
+                    formula_totals: bool = False) -> Dict[str, Any]:
+    """把成绩表写为 xlsx / xls / csv（默认按扩展名），返回文件信息
+
+    sheets 大于1时按班级拆为多个工作表（CSV忽略）；instructions 默认在多工作表时追加"填写说明"页；
+    formula_totals 为True时 xlsx 的总分列写为带缓存计算结果的 SUM 公式。
+    """
+    file_format = (file_format or os.path.splitext(path)[1].lstrip('.')).lower()
+    if file_format == 'csv':
+        _write_csv(path, df, encoding, merged_header)
+        sheet_frames = {'csv': df}
+    elif file_format in EXCEL_MAX_ROWS:
+        sheet_frames = split_sheets(df, sheets)
+        largest = max(len(frame) for frame in sheet_frames.values()) + 1 + merged_header
+        if largest > EXCEL_MAX_ROWS[file_format]:
+            raise ValueError(f'{file_format} 单个工作表最多 {EXCEL_MAX_ROWS[file_format]} 行，需要 {largest} 行')
+        instructions = sheets > 1 if instructions is None else instructions
+        if file_format == 'xlsx':
+            _write_xlsx(path, sheet_frames, merged_header, instructions, formula_totals)
+        else:
+            _write_xls(path, sheet_frames, merged_header, instructions)
+    else:
+        raise ValueError(f'不支持的文件格式: {file_format}')
+
+    return {
+        'path': path,
+        'format': file_format,
+        'bytes': os.path.getsize(path),
+        'rows': len(df),
+        'columns': len(df.columns),
+        'sheets': len(sheet_frames)
+    }
+
+
+def generate(path: str, rows: int, layout: str = 'wide', file_format: Optional[str] = None, encoding: str = 'utf-8',
+             noisy_headers: bool = False, merged_header: bool = False, sheets: int = 1, seed: int = 42,
+             formula_totals: bool = False) -> Dict[str, Any]:
+    """生成并写出一个合成成绩文件"""
+    df = make_exam_frame(rows, layout, noisy_headers, seed=seed)
+    return write_exam_file(path, df, file_format, encoding, merged_header, sheets, formula_totals=formula_totals)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='生成合成成绩文件')
+    parser.add_argument('path', help='输出文件（扩展名 .xlsx / .xls / .csv 决定格式）')
+    parser.add_argument('--rows', type=int, default=1000)
+    parser.add_argument('--layout', choices=['wide', 'long'], default='wide')
+    parser.add_argument('--encoding', choices=['utf-8', 'gbk'], default='utf-8', help='CSV编码')
+    parser.add_argument('--noisy-headers', action='store_true')
+    parser.add_argument('--merged-header', action='store_true')
+    parser.add_argument('--sheets', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--formula-totals', action='store_true', help='xlsx 的总分列写为 SUM 公式')
+    args = parser.parse_args()
+
+    info = generate(args.path, args.rows, args.layout, encoding=args.encoding, noisy_headers=args.noisy_headers,
+                    merged_header=args.merged_header, sheets=args.sheets, seed=args.seed,
+                    formula_totals=args.formula_totals)
+    print(f"已生成 {info['path']}: {info['rows']} 行, {info['columns']} 列, {info['sheets']} 个工作表, {info['bytes']} 字节")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+增量导入
+为每个用户的每次导入（按考试ID或文件名区分）保存每条 (学号, 科目) 记录的内容摘要，
+同一份成绩表修改后重新上传时，只返回新增、修改和删除的记录
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+KEY_COLUMNS = ('student_id', 'subject')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS imports (
+    import_id INTEGER PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    import_key TEXT NOT NULL,
+    version TEXT NOT NULL,
+    record_count INTEGER NOT NULL,
+    updated_at REAL NOT NULL,
+    UNIQUE (user_id, import_key)
+);
+CREATE TABLE IF NOT EXISTS fingerprints (
+    import_id INTEGER NOT NULL,
+    key_hash INTEGER NOT NULL,
+    digest INTEGER NOT NULL,
+    student_id TEXT,
+    subject TEXT,
+    occurrence INTEGER NOT NULL,
+    PRIMARY KEY (import_id, key_hash)
+) WITHOUT ROWID;
+"""
+
+
+def _hash(values: pd.DataFrame) -> np.ndarray:
+    return pd.util.hash_pandas_object(values, index=False).to_numpy()
+
+
+def _digest(frame: pd.DataFrame) -> np.ndarray:
+    """记录全部字段的摘要，与列顺序无关；字段集合不同的记录摘要不同"""
+    columns = sorted(frame.columns)
+    if not columns:
+        return np.zeros(len(frame), dtype=np.uint64)
+    names_hash = pd.util.hash_array(np.array(['\x1f'.join(map(str, columns))], dtype=object))[0]
+    return _hash(frame[columns]) ^ names_hash
+
+
+def record_fingerprints(frames: List[pd.DataFrame], key_columns: Sequence[str] = KEY_COLUMNS) -> pd.DataFrame:
+    """依次排列的各表中每条记录的键和内容摘要（64位哈希）
+
+    键为 (学号, 科目, 同键记录的序号)，同一学生同一科目出现多次时按出现顺序区分；
+    摘要覆盖记录的全部字段，分类列与普通列的哈希相同。
+    """
+    keys = pd.concat([
+        pd.DataFrame({
+            name: frame[name].astype(object) if name in frame else pd.Series(None, index=frame.index, dtype=object)
+            for name in key_columns
+        })
+        for frame in frames
+    ], ignore_index=True) if frames else pd.DataFrame(columns=list(key_columns), dtype=object)
+    keys = keys.where(keys.notna(), None)
+    keys['occurrence'] = keys.groupby(list(key_columns), dropna=False, sort=False).cumcount()
+    
+    keys['key_hash'] = _hash(keys).view(np.int64)
+    keys['digest'] = np.concatenate([_digest(frame) for frame in frames] or [np.zeros(0, dtype=np.uint64)]).view(np.int64)
+    return keys
+
+
+def diff_fingerprints(previous: pd.DataFrame, current: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray, pd.DataFrame]:
+    """对比两次导入的摘要，返回 (新增记录的位置, 修改记录的位置, 被删除记录的键)
+
+    位置为 current 中的行号；被删除记录的键取自 previous。
+    """
+    previous_index = pd.Index(previous['key_hash'])
+    positions = previous_index.get_indexer(current['key_hash'].to_numpy())
+    matched = positions >= 0
+    
+    inserted = np.flatnonzero(~matched)
+    changed = np.flatnonzero(matched)
+    changed = changed[previous['digest'].to_numpy()[positions[changed]] != current['digest'].to_numpy()[changed]]
+    deleted = previous[~previous_index.isin(current['key_hash'])]
+    return inserted, changed, deleted
+
+
+class FingerprintStore:
+    """按 (用户ID, 导入键) 保存上一次导入的记录摘要的SQLite存储，多个worker进程共用同一个数据库文件"""
+    
+    def __init__(self, path: str, ttl: float = 30 * 24 * 3600):
+        self.path = path
+        self.ttl = ttl
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.stats = {'lookups': 0, 'baselines': 0, 'saves': 0}
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+    
+    def _connect(self) -> sqlite3.Connection:
+        # 每个线程一个连接；WAL模式下读写互不阻塞
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            connection.executescript(SCHEMA)
+            self._local.connection = connection
+        return connection
+    
+    def _count(self, stat: str) -> None:
+        with self._lock:
+            self.stats[stat] += 1
+    
+    def load(self, user_id: str, import_key: str, version: str) -> Optional[Tuple[Dict[str, Any], pd.DataFrame]]:
+        """上一次导入的 (元信息, 摘要表)；没有记录、已过期或处理配置版本不同时返回None"""
+        self._count('lookups')
+        connection = self._connect()
+        row = connection.execute(
+            'SELECT import_id, version, record_count, updated_at FROM imports WHERE user_id = ? AND import_key = ?',
+            (user_id, import_key)
+        ).fetchone()
+        if row is None or row[1] != version or row[3] < time.time() - self.ttl:
+            return None
+        
+        fingerprints = pd.read_sql_query(
+            'SELECT key_hash, digest, student_id, subject, occurrence FROM fingerprints WHERE import_id = ?',
+            connection, params=(row[0],)
+        )
+        self._count('baselines')
+        return {'record_count': row[2], 'updated_at': row[3]}, fingerprints
+    
+    def save(self, user_id: str, import_key: str, version: str, fingerprints: pd.DataFrame) -> None:
+        """用本次导入的摘要替换上一次的记录，并清理过期的导入"""
+        self.purge_expired()
+        connection = self._connect()
+        rows = zip(
+            fingerprints['key_hash'].tolist(), fingerprints['digest'].tolist(),
+            fingerprints['student_id'].tolist(), fingerprints['subject'].tolist(), fingerprints['occurrence'].tolist()
+        )
+        with connection:
+            connection.execute(
+                'INSERT INTO imports (user_id, import_key, version, record_count, updated_at) VALUES (?, ?, ?, ?, ?) '
+                'ON CONFLICT (user_id, import_key) DO UPDATE SET '
+                'version = excluded.version, record_count = excluded.record_count, updated_at = excluded.updated_at',
+                (user_id, import_key, version, len(fingerprints), time.time())
+            )
+            import_id = connection.execute(
+                'SELECT import_id FROM imports WHERE user_id = ? AND import_key = ?', (user_id, import_key)
+            ).fetchone()[0]
+            connection.execute('DELETE FROM fingerprints WHERE import_id = ?', (import_id,))
+            connection.executemany(
+                'INSERT OR REPLACE INTO fingerprints (import_id, key_hash, digest, student_id, subject, occurrence) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                ((import_id, *row) for row in rows)
+            )
+        self._count('saves')
+    
+    def purge_expired(self) -> int:
+        """删除超过 ttl 未更新的导入记录，返回删除的导入数"""
+        connection = self._connect()
+        cutoff = time.time() - self.ttl
+        with connection:
+            connection.execute(
+                'DELETE FROM fingerprints WHERE import_id IN (SELECT import_id FROM imports WHERE updated_at < ?)',
+                (cutoff,)
+            )
+            return connection.execute('DELETE FROM imports WHERE updated_at < ?', (cutoff,)).rowcount
+    
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self.stats)
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+成绩记录的紧凑表示
+处理结果在服务内部以列式批（GradeRecordBatch）流转，学号、姓名、班级、科目等重复度高的文本列以分类编码存储，
+只在输出边界转换为字典列表、直接编码为JSON，或转换为Arrow表（Arrow IPC / Parquet），不再为每个 (学生, 科目) 生成一个字典
+"""
+
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # 可选依赖：未安装时只能输出JSON
+    pa = pq = None
+
+PYARROW_AVAILABLE = pa is not None
+
+# 不同取值数不超过行数的该比例时，文本列按分类编码存储
+CATEGORY_RATIO = 0.5
+
+ARROW_STREAM_MIMETYPE = 'application/vnd.apache.arrow.stream'
+PARQUET_MIMETYPE = 'application/vnd.apache.parquet'
+
+NumericParser = Callable[[pd.Series], pd.Series]
+
+
+def _is_text_column(column: pd.Series) -> bool:
+    """只含字符串和None的列：转为分类后可以无损还原"""
+    if column.dtype != object or pd.api.types.infer_dtype(column, skipna=True) not in ('string', 'empty'):
+        return False
+    missing = column.isna().to_numpy()
+    return all(value is None for value in column.to_numpy()[missing])
+
+
+class GradeRecordBatch:
+    """列式的成绩记录批，列与 build_wide_frame / build_long_frame 的结果一致"""
+    
+    def __init__(self, frame: pd.DataFrame):
+        self.frame = frame
+    
+    @classmethod
+    def from_frame(cls, frame: pd.DataFrame, category_ratio: float = CATEGORY_RATIO) -> 'GradeRecordBatch':
+        """把映射结果转换为紧凑批；数值列保持原样，重复度高的文本列转为分类编码"""
+        columns = {}
+        for name in frame.columns:
+            column = frame[name]
+            if len(column) and _is_text_column(column) and column.nunique() <= len(column) * category_ratio:
+                column = column.astype('category')
+            columns[name] = column
+        return cls(pd.DataFrame(columns, index=pd.RangeIndex(len(frame))))
+    
+    def __len__(self) -> int:
+        return len(self.frame)
+    
+    @property
+    def columns(self) -> List[str]:
+        return list(self.frame.columns)
+    
+    def with_column(self, name: str, value: Any) -> 'GradeRecordBatch':
+        """追加取值相同的一列（如工作表名）"""
+        frame = self.frame.copy(deep=False)
+        frame[name] = pd.Categorical.from_codes(np.zeros(len(frame), dtype=np.int8), [value])
+        return GradeRecordBatch(frame)
+    
+    @property
+    def categorical_columns(self) -> List[str]:
+        return [name for name in self.frame.columns if isinstance(self.frame[name].dtype, pd.CategoricalDtype)]
+    
+    def take(self, positions: np.ndarray) -> 'GradeRecordBatch':
+        """按行号取出部分记录，分类编码保持不变"""
+        return GradeRecordBatch(self.frame.iloc[positions].reset_index(drop=True))
+    
+    def memory_bytes(self) -> int:
+        return int(self.frame.memory_usage(index=True, deep=True).sum())
+    
+    def _factorized(self, name: str):
+        """(编码, 取值表)：分类列直接使用其编码，其余列整列分解；缺失值编码为 -1"""
+        column = self.frame[name]
+        if isinstance(column.dtype, pd.CategoricalDtype):
+            return column.cat.codes.to_numpy(), column.cat.categories.tolist()
+        if column.dtype != object or _is_text_column(column):
+            codes, uniques = pd.factorize(column)
+            return codes, uniques.tolist()
+        # 混合类型的列（如 1 与 1.0）不能按相等合并，逐值处理
+        return None, None
+    
+    def column_values(self, name: str) -> List[Any]:
+        """某一列的Python值列表，与原始DataFrame的 tolist() 相同（分类列的缺失值还原为None）"""
+        column = self.frame[name]
+        if not isinstance(column.dtype, pd.CategoricalDtype):
+            return column.tolist()
+        table = np.array(column.cat.categories.tolist() + [None], dtype=object)
+        return table[column.cat.codes.to_numpy()].tolist()
+    
+    def to_records(self) -> List[Dict[str, Any]]:
+        """转换为字典列表（仅在输出边界使用）"""
+        columns = self.columns
+        values = [self.column_values(name) for name in columns]
+        return [dict(zip(columns, row)) for row in zip(*values)]
+    
+    def json_records(self, dumps: Callable[[Any], str], sort_keys: bool = True) -> List[str]:
+        """每条记录的JSON文本，与 dumps(记录字典) 的结果相同
+
+        每列只对不同的取值编码一次，再按编码拼接，避免逐条构造字典。
+        """
+        columns = sorted(self.columns) if sort_keys else self.columns
+        encoded = []
+        for name in columns:
+            prefix = f'{dumps(name)}: '
+            codes, uniques = self._factorized(name)
+            if codes is None:
+                encoded.append([prefix + dumps(value) for value in self.column_values(name)])
+                continue
+            
+            table = np.array([prefix + dumps(value) for value in uniques] + [None], dtype=object)
+            parts = table[codes]
+            missing = np.flatnonzero(codes < 0)
+            if len(missing):
+                # 缺失值按原值编码（None 为 null，NaN 为 NaN）
+                values = self.column_values(name)
+                for i in missing:
+                    parts[i] = prefix + dumps(values[i])
+            encoded.append(parts.tolist())
+        
+        return ['{' + ', '.join(row) + '}' for row in zip(*encoded)]
+    
+    def _arrow_numeric(self, name: str, parse: NumericParser) -> 'pa.Array':
+        """float32 数值列，无法解析的值为空；分类列只解析各个不同的取值"""
+        column = self.frame[name]
+        if isinstance(column.dtype, pd.CategoricalDtype):
+            table = np.append(parse(pd.Series(column.cat.categories, dtype=object)).to_numpy(dtype=np.float64), np.nan)
+            values = table[column.cat.codes.to_numpy()]
+        else:
+            values = parse(column).to_numpy(dtype=np.float64)
+        return pa.array(values.astype(np.float32), from_pandas=True)
+    
+    def _arrow_text(self, name: str, dictionary: bool) -> 'pa.Array':
+        """字符串列；dictionary 为True时字典编码（int32索引）"""
+        column = self.frame[name]
+        if dictionary and isinstance(column.dtype, pd.CategoricalDtype):
+            codes = column.cat.codes.to_numpy()
+            return pa.DictionaryArray.from_arrays(
+                pa.array(codes.astype(np.int32), mask=codes < 0),
+                pa.array([str(value) for value in column.cat.categories], type=pa.string())
+            )
+        values = [None if value is None or value != value else str(value) for value in self.column_values(name)]
+        array = pa.array(values, type=pa.string())
+        return array.dictionary_encode() if dictionary else array
+    
+    def to_arrow(self, columns: Optional[List[str]] = None, numeric_columns: Iterable[str] = (),
+                 dictionary_columns: Optional[Iterable[str]] = None,
+                 parse_numeric: Optional[NumericParser] = None) -> 'pa.Table':
+        """转换为Arrow表：numeric_columns 为float32，dictionary_columns（默认为分类列）字典编码，其余为字符串
+
+        columns 指定输出的列及顺序，批中没有的列全部为空；parse_numeric 把一列转换为浮点数，默认 pd.to_numeric。
+        """
+        if pa is None:
+            raise RuntimeError('输出Arrow/Parquet需要安装 pyarrow')
+        columns = self.columns if columns is None else columns
+        numeric_columns = set(numeric_columns)
+        dictionary_columns = set(self.categorical_columns if dictionary_columns is None else dictionary_columns)
+        parse_numeric = parse_numeric or (lambda column: pd.to_numeric(column, errors='coerce'))
+        
+        arrays = []
+        for name in columns:
+            if name in numeric_columns:
+                array = self._arrow_numeric(name, parse_numeric) if name in self.frame else None
+                arrow_type = pa.float32()
+            else:
+                dictionary = name in dictionary_columns
+                array = self._arrow_text(name, dictionary) if name in self.frame else None
+                arrow_type = pa.dictionary(pa.int32(), pa.string()) if dictionary else pa.string()
+            arrays.append(array if array is not None else pa.nulls(len(self), arrow_type))
+        return pa.Table.from_arrays(arrays, names=columns)
+
+
+def batches_to_arrow(batches: List[GradeRecordBatch], numeric_columns: Iterable[str] = (),
+                     parse_numeric: Optional[NumericParser] = None) -> 'pa.Table':
+    """合并多个批为一张Arrow表：列取各批的并集，某列在任一批中为分类列时整列字典编码"""
+    columns, dictionary_columns = [], set()
+    for batch in batches:
+        columns.extend(name for name in batch.columns if name not in columns)
+        dictionary_columns.update(batch.categorical_columns)
+    numeric_columns = set(numeric_columns)
+    tables = [
+        batch.to_arrow(columns, numeric_columns, dictionary_columns, parse_numeric) for batch in batches if len(batch)
+    ]
+    if not tables:
+        return GradeRecordBatch(pd.DataFrame(columns=columns)).to_arrow(columns, numeric_columns, dictionary_columns)
+    # 各批的字典合并为一个，Arrow IPC 和 Parquet 都按单一字典写出
+    return pa.concat_tables(tables).unify_dictionaries()
+
+
+def serialize_arrow(table: 'pa.Table', output_format: str, metadata: Optional[Dict[str, str]] = None) -> bytes:
+    """把Arrow表序列化为 Arrow IPC 流（arrow）或 Parquet（parquet），metadata 写入schema的键值元数据"""
+    if metadata:
+        table = table.replace_schema_metadata({**(table.schema.metadata or {}), **metadata})
+    sink = pa.BufferOutputStream()
+    if output_format == 'parquet':
+        pq.write_table(table, sink)
+    else:
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+    return sink.getvalue().to_pybytes()
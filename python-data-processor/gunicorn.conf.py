@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+"""
+gunicorn 生产配置
+用法: gunicorn -c gunicorn.conf.py
+各项均可通过环境变量覆盖
+"""
+
+import multiprocessing
+import os
+
+wsgi_app = 'app:app'
+bind = os.getenv('GUNICORN_BIND', f"0.0.0.0:{os.getenv('PORT', '5000')}")
+
+# 解析和清洗是CPU密集型任务。启用进程池时（默认）由各worker的进程池执行，worker只负责收发请求，
+# 默认2个；app 按 CPU核数 // worker数 确定每个worker的进程池大小，整机的处理进程数约等于核数。
+# 关闭进程池（PROCESS_POOL_WORKERS=0）时在worker内处理，worker数默认与CPU核数一致。
+# 每个进程内少量线程用于在等待认证、上传时让出CPU
+_cpus = multiprocessing.cpu_count()
+_pool_enabled = os.getenv('PROCESS_POOL_WORKERS') != '0'
+workers = int(os.getenv('WEB_CONCURRENCY', min(2, _cpus) if _pool_enabled else _cpus))
+# 传给worker进程，供 app 计算进程池大小
+os.environ['WEB_CONCURRENCY'] = str(workers)
+worker_class = 'gthread'
+threads = int(os.getenv('GUNICORN_THREADS', 2))
+
+# 单个请求（含大文件解析）的最长处理时间，超时的worker会被重启
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 120))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', 5))
+
+# 定期重启worker，释放pandas解析大文件后残留的内存
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', 1000))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', 100))
+
+# 请求行和请求头的限制；请求体上限由应用的 MAX_CONTENT_LENGTH（MAX_FILE_SIZE）控制
+limit_request_line = 8190
+limit_request_fields = 100
+
+accesslog = os.getenv('GUNICORN_ACCESS_LOG', '-')
+errorlog = '-'
+loglevel = os.getenv('GUNICORN_LOG_LEVEL', 'info')
+
+
+def post_worker_init(worker):
+    """worker载入应用后开始预热（方式见 WARMUP_MODE，默认后台执行，完成前 /ready 返回503）"""
+    from app import warm_up
+    warm_up.start()
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+处理结果缓存
+按 (用户ID, 文件内容哈希, 映射配置版本, 用途) 缓存解析结果和接口响应，
+内存层按条数和字节数做LRU淘汰，可选的磁盘层在进程重启后依然有效
+"""
+
+import hashlib
+import logging
+import os
+import pickle
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class ResultCache:
+    """内存LRU + 可选磁盘层的结果缓存"""
+    
+    def __init__(self, max_entries: int = 128, max_bytes: int = 256 * 1024 * 1024,
+                 disk_dir: Optional[str] = None, disk_max_bytes: int = 1024 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self.disk_max_bytes = disk_max_bytes
+        self._entries = OrderedDict()  # 键 -> (值, 字节数)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'disk_hits': 0, 'misses': 0, 'evictions': 0, 'disk_evictions': 0}
+        
+        if self.disk_dir and not self._secure_disk_dir():
+            self.disk_dir = None
+    
+    def _secure_disk_dir(self) -> bool:
+        """磁盘层以pickle保存，读取时会执行文件中的代码：目录必须属于当前用户且只有当前用户可访问，否则关闭磁盘层"""
+        try:
+            os.makedirs(self.disk_dir, mode=0o700, exist_ok=True)
+            stat = os.stat(self.disk_dir)
+            if stat.st_uid != os.getuid():
+                logger.warning(f"磁盘缓存目录 {self.disk_dir} 不属于当前用户，已关闭磁盘缓存")
+                return False
+            if stat.st_mode & 0o077:
+                os.chmod(self.disk_dir, 0o700)
+        except OSError as e:
+            logger.warning(f"磁盘缓存目录不可用，已关闭磁盘缓存: {e}")
+            return False
+        return True
+    
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 or bool(self.disk_dir)
+    
+    @staticmethod
+    def make_key(*parts: Any) -> str:
+        """由各组成部分生成缓存键"""
+        return hashlib.sha256('\x1f'.join(str(part) for part in parts).encode('utf-8')).hexdigest()
+    
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.stats['hits'] += 1
+                return entry[0]
+        
+        loaded = self._disk_get(key)
+        with self._lock:
+            if loaded is None:
+                self.stats['misses'] += 1
+                return None
+            self.stats['disk_hits'] += 1
+        
+        # 磁盘命中的条目提升回内存层
+        value, size = loaded
+        self._memory_put(key, value, size)
+        return value
+    
+    def contains(self, key: str) -> bool:
+        """是否已缓存，不计入命中统计"""
+        with self._lock:
+            if key in self._entries:
+                return True
+        return bool(self.disk_dir) and os.path.exists(self._disk_path(key))
+    
+    def put(self, key: str, value: Any, size: int) -> None:
+        """写入缓存；size 为值的估算字节数，用于按字节淘汰"""
+        if not self.enabled:
+            return
+        self._memory_put(key, value, size)
+        self._disk_put(key, value, size)
+    
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.stats['hits'] + self.stats['disk_hits'] + self.stats['misses']
+            hits = self.stats['hits'] + self.stats['disk_hits']
+            return {
+                **self.stats,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'hit_rate': round(hits / lookups, 4) if lookups else 0.0
+            }
+    
+    def _memory_put(self, key: str, value: Any, size: int) -> None:
+        # 超过整个内存预算的值只进磁盘层
+        if self.max_entries <= 0 or size > self.max_bytes:
+            return
+        
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[1]
+            self._entries[key] = (value, size)
+            self._bytes += size
+            
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.stats['evictions'] += 1
+    
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, f'{key}.pkl')
+    
+    def _disk_get(self, key: str) -> Optional[Tuple[Any, int]]:
+        if not self.disk_dir:
+            return None
+        
+        path = self._disk_path(key)
+        try:
+            with open(path, 'rb') as f:
+                if os.fstat(f.fileno()).st_uid != os.getuid():
+                    logger.warning(f"磁盘缓存文件 {path} 不属于当前用户，已忽略")
+                    return None
+                size, value = pickle.load(f)
+            os.utime(path)  # 以修改时间记录最近使用
+            return value, size
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"读取磁盘缓存失败，已忽略: {e}")
+            return None
+    
+    def _disk_put(self, key: str, value: Any, size: int) -> None:
+        if not self.disk_dir or size > self.disk_max_bytes:
+            return
+        
+        path = self._disk_path(key)
+        temp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        try:
+            with open(temp_path, 'wb') as f:
+                pickle.dump((size, value), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, path)
+        except Exception as e:
+            logger.warning(f"写入磁盘缓存失败，已忽略: {e}")
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            return
+        
+        self._disk_evict()
+    
+    def _disk_evict(self) -> None:
+        """磁盘层超出容量时按最近使用时间从旧到新删除"""
+        files = []
+        total = 0
+        for entry in os.scandir(self.disk_dir):
+            if entry.name.endswith('.pkl'):
+                stat = entry.stat()
+                files.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+        
+        for _, file_size, path in sorted(files):
+            if total <= self.disk_max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= file_size
+                with self._lock:
+                    self.stats['disk_evictions'] += 1
+            except OSError:
+                pass
@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+"""
+测试公共配置
+导入 app 之前关闭进程池并把任务、摘要等目录指向临时目录；接口测试跳过 Supabase 认证
+"""
+
+import io
+import os
+import sys
+import tempfile
+
+import pytest
+
+TEST_DIR = tempfile.mkdtemp(prefix='edu-tests-')
+os.environ.setdefault('PROCESS_POOL_WORKERS', '0')
+os.environ.setdefault('BATCH_JOB_DIR', os.path.join(TEST_DIR, 'batch-jobs'))
+os.environ.setdefault('DELTA_STORE_PATH', os.path.join(TEST_DIR, 'delta', 'fingerprints.sqlite3'))
+os.environ.setdefault('WARMUP_MODE', 'off')
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as app_module  # noqa: E402
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(app_module, 'authenticate_user', lambda header: 'user-1' if header else None)
+    return app_module.app.test_client()
+
+
+@pytest.fixture
+def post(client):
+    """上传单个文件：post(路径, 文件内容, 文件名)"""
+    def upload(path, data, filename, headers=None, **kwargs):
+        return client.post(path, data={'file': (io.BytesIO(data), filename)},
+                           headers={'Authorization': 'Bearer test', **(headers or {})},
+                           content_type='multipart/form-data', **kwargs)
+    return upload
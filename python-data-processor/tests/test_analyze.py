@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+"""/analyze 采样分析：默认只读样本行；开启 ANALYZE_PREPARSE 时 /process 复用后台解析的结果"""
+
+import time
+
+import pytest
+
+import app
+
+CSV = ('学号,姓名,班级,语文,数学\n' + ''.join(f'A{i:04d},学生{i},1班,{80 + i % 20},{90 - i % 15}\n' for i in range(200))).encode('utf-8')
+
+
+def _wait_preparsed(timeout=10):
+    deadline = time.monotonic() + timeout
+    while app._preparsing and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert not app._preparsing
+
+
+def _count_parses(monkeypatch):
+    calls = []
+    original = app.parse_upload_source
+    monkeypatch.setattr(app, 'parse_upload_source', lambda *args, **kwargs: calls.append(1) or original(*args, **kwargs))
+    return calls
+
+
+@pytest.fixture
+def preparse(monkeypatch):
+    monkeypatch.setattr(app, 'ANALYZE_PREPARSE', True)
+
+
+def test_analyze_reads_only_sample_by_default(post, monkeypatch):
+    assert app.ANALYZE_PREPARSE is False
+    calls = _count_parses(monkeypatch)
+    submitted = []
+    monkeypatch.setattr(app.processing_pool, 'submit', lambda *args: submitted.append(args))
+
+    analysis = post('/analyze', CSV + 'A8888,y,1班,1,2\n'.encode('utf-8'), 'sample.csv').get_json()['analysis']
+
+    assert analysis['file_info']['sampled_rows'] == app.ANALYZE_SAMPLE_ROWS
+    assert app._preparsing == {}
+    assert submitted == []
+    assert calls == []
+
+
+def test_process_reuses_background_parse(post, monkeypatch, preparse):
+    calls = _count_parses(monkeypatch)
+    analysis = post('/analyze', CSV, 'reuse.csv').get_json()['analysis']
+    assert analysis['file_info']['sampled_rows'] == app.ANALYZE_SAMPLE_ROWS
+    _wait_preparsed()
+    assert len(calls) == 1
+
+    response = post('/process', CSV, 'reuse.csv')
+    body = response.get_json()
+    assert response.status_code == 200
+    assert len(calls) == 1
+    assert body['report']['processing_stats']['total_records'] == 200
+    assert body['data'][0]['student_id'] == 'A0000'
+
+
+def test_no_background_parse_without_cache(post, monkeypatch, preparse):
+    calls = _count_parses(monkeypatch)
+    post('/analyze?cache=0', CSV + 'A9999,x,1班,1,2\n'.encode('utf-8'), 'nocache.csv')
+    _wait_preparsed()
+    assert calls == []
@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+"""认证：远程验证结果的缓存（本地桩认证服务）和 JWT 本地验证"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import jwt
+import pytest
+
+import app
+
+SECRET = 'test-secret'
+
+
+def _token(exp_in=3600, secret=SECRET, **claims):
+    payload = {'sub': 'user-42', 'aud': 'authenticated', 'exp': int(time.time()) + exp_in, **claims}
+    return jwt.encode({key: value for key, value in payload.items() if value is not None}, secret, algorithm='HS256')
+
+
+@pytest.fixture
+def auth_server(monkeypatch):
+    """模拟 Supabase 的 /auth/v1/user：users 中的token返回对应用户，其余返回401"""
+    users = {}
+    requests_seen = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            token = self.headers.get('Authorization', '').replace('Bearer ', '')
+            requests_seen.append((self.path, token))
+            user_id = users.get(token)
+            body = json.dumps({'id': user_id} if user_id else {'msg': 'invalid token'}).encode('utf-8')
+            self.send_response(200 if user_id else 401)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, kwargs={'poll_interval': 0.01}, daemon=True).start()
+    monkeypatch.setattr(app, 'SUPABASE_URL', f'http://127.0.0.1:{server.server_port}')
+    monkeypatch.setattr(app, 'SUPABASE_JWT_SECRET', None)
+    monkeypatch.setattr(app, 'SUPABASE_JWKS_URL', None)
+    monkeypatch.setattr(app, 'token_cache', app.TokenCache())
+    monkeypatch.setattr(app, '_auth_session', None)
+    yield users, requests_seen
+    server.shutdown()
+    server.server_close()
+
+
+def test_remote_result_cached(auth_server):
+    users, requests_seen = auth_server
+    token = _token(secret='unknown-to-service')
+    users[token] = 'user-42'
+
+    assert app.authenticate_user(f'Bearer {token}') == 'user-42'
+    assert app.authenticate_user(f'Bearer {token}') == 'user-42'
+    assert requests_seen == [('/auth/v1/user', token)]
+    snapshot = app.token_cache.snapshot()
+    assert snapshot['hits'] == 1 and snapshot['remote_verifications'] == 1 and snapshot['size'] == 1
+
+
+def test_cache_bounded_by_token_expiry(auth_server):
+    users, _ = auth_server
+    token = _token(exp_in=30)
+    users[token] = 'user-42'
+
+    app.authenticate_user(f'Bearer {token}')
+    expires_at = app.token_cache._entries[app.TokenCache.key(token)][1]
+    assert expires_at <= jwt.decode(token, options={'verify_signature': False})['exp']
+
+
+def test_rejected_token_not_cached(auth_server):
+    _, requests_seen = auth_server
+    token = _token()
+
+    assert app.authenticate_user(f'Bearer {token}') is None
+    assert app.authenticate_user(f'Bearer {token}') is None
+    assert len(requests_seen) == 2
+    assert app.token_cache.snapshot()['failures'] == 2
+
+
+def test_expired_token_rejected_without_request(auth_server):
+    users, requests_seen = auth_server
+    token = _token(exp_in=-10)
+    users[token] = 'user-42'
+
+    assert app.authenticate_user(f'Bearer {token}') is None
+    assert requests_seen == []
+
+
+def test_malformed_header(auth_server):
+    _, requests_seen = auth_server
+    assert app.authenticate_user(None) is None
+    assert app.authenticate_user('Token abc') is None
+    assert requests_seen == []
+
+
+@pytest.mark.parametrize('token, expected', [
+    (lambda: _token(), 'user-42'),
+    (lambda: _token(secret='wrong-secret'), None),
+    (lambda: _token(exp_in=-10), None),
+    (lambda: _token(aud='anon'), None),
+    (lambda: _token(sub=None), None),
+    (lambda: 'not-a-jwt', None),
+])
+def test_local_verification(auth_server, monkeypatch, token, expected):
+    _, requests_seen = auth_server
+    monkeypatch.setattr(app, 'SUPABASE_JWT_SECRET', SECRET)
+
+    assert app.authenticate_user(f'Bearer {token()}') == expected
+    assert requests_seen == []
+    assert app.token_cache.snapshot()['local_verifications'] == 1
+
+
+def test_require_auth_rejects_invalid_token(auth_server):
+    response = app.app.test_client().post('/analyze', headers={'Authorization': f'Bearer {_token()}'})
+    assert response.status_code == 401
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+"""批量任务：执行进程退出后未结束的文件标记为失败"""
+
+import os
+import subprocess
+import sys
+
+from batch_jobs import BatchJobStore
+
+
+class _Upload:
+    def __init__(self, filename, data=b'x'):
+        self.filename = filename
+        self.data = data
+
+    def save(self, path):
+        with open(path, 'wb') as f:
+            f.write(self.data)
+
+
+def _dead_pid():
+    process = subprocess.Popen([sys.executable, '-c', 'pass'])
+    process.wait()
+    return process.pid
+
+
+def _orphan(store, pid):
+    job = store.create('user-1', [_Upload('a.csv'), _Upload('b.csv')])
+    job['owner']['pid'] = pid
+    store._write(job)
+    store.save_result(job['job_id'], 0, b'{}')
+    store.update_file(job['job_id'], 0, status='completed')
+    store.update_file(job['job_id'], 1, status='processing')
+    return job['job_id']
+
+
+def test_orphaned_job_marked_failed(tmp_path):
+    store = BatchJobStore(str(tmp_path))
+    job_id = _orphan(store, _dead_pid())
+
+    assert store.fail_all_orphaned() == 1
+    job = store.get(job_id)
+    assert job['status'] == 'completed'
+    assert [entry['status'] for entry in job['files']] == ['completed', 'failed']
+    assert job['files'][1]['error_type'] == 'WorkerExited'
+    assert not os.path.exists(store.file_path(job, 1))
+
+
+def test_running_job_untouched(tmp_path):
+    store = BatchJobStore(str(tmp_path))
+    job_id = _orphan(store, os.getpid())
+
+    assert store.fail_all_orphaned() == 0
+    assert store.get(job_id)['status'] == 'running'
+
+
+def test_stream_ends_for_orphaned_job(client, monkeypatch, tmp_path):
+    import app
+
+    store = BatchJobStore(str(tmp_path))
+    monkeypatch.setattr(app, 'batch_store', store)
+    job_id = _orphan(store, _dead_pid())
+
+    response = client.get(f'/process/batch/{job_id}/stream', headers={'Authorization': 'Bearer test'})
+    lines = [app.json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert lines[-1]['type'] == 'job'
+    assert lines[-1]['job']['failed'] == 1
@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+"""分块模式：多块文件的输出与默认模式一致"""
+
+import io
+import json
+
+import pytest
+
+import app as app_module
+
+ROWS = 23
+CSV = ('学号,姓名,班级,语文,数学\n' + ''.join(
+    f'C{i:03d},学生{i},{i % 3 + 1}班,{"缺考" if i == 5 else 80 + i},{90 - i}\n' for i in range(ROWS)
+)).encode('utf-8')
+
+
+def test_chunked_json_matches_default(post):
+    expected = post('/process?cache=0', CSV, 'chunks.csv').get_json()
+    response = post('/process?cache=0&chunked=1&chunk_size=5', CSV, 'chunks.csv')
+    body = response.get_json()
+
+    assert response.status_code == 200
+    assert body['success'] is True
+    assert body['data'] == expected['data']
+    assert len(body['data']) == ROWS
+    assert body['report']['processing_stats'] == expected['report']['processing_stats']
+    assert body['report']['file_info']['rows'] == ROWS
+
+
+def test_chunked_unmapped_columns(post):
+    response = post('/process?cache=0&chunked=1', '甲,乙\n1,2\n'.encode('utf-8'), 'unknown.csv')
+    assert response.status_code == 400
+
+
+def test_chunked_arrow_matches_default(post):
+    pyarrow = pytest.importorskip('pyarrow')
+    import pyarrow.ipc  # noqa: F401
+
+    def table(query):
+        response = post(f'/process?cache=0&format=arrow{query}', CSV, 'chunks.csv')
+        assert response.status_code == 200
+        return pyarrow.ipc.open_stream(io.BytesIO(response.data)).read_all()
+
+    chunked = table('&chunked=1&chunk_size=5')
+    assert chunked.num_rows == ROWS
+    assert chunked.to_pylist() == table('').to_pylist()
+
+
+def test_ndjson_stream(post):
+    expected = post('/process?cache=0', CSV, 'chunks.csv').get_json()
+    response = post('/process?cache=0&stream=ndjson&chunk_size=5', CSV, 'chunks.csv',
+                    headers={'Accept': 'application/x-ndjson'})
+    assert response.status_code == 200
+    assert response.mimetype == 'application/x-ndjson'
+
+    lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    chunks, trailer = lines[:-1], lines[-1]
+    assert [chunk['type'] for chunk in chunks] == ['records'] * 5
+    assert [chunk['offset'] for chunk in chunks] == [0, 5, 10, 15, 20]
+    assert [len(chunk['data']) for chunk in chunks] == [5, 5, 5, 5, 3]
+    assert [record for chunk in chunks for record in chunk['data']] == expected['data']
+
+    assert trailer['type'] == 'report'
+    assert trailer['report']['processing_stats'] == expected['report']['processing_stats']
+    assert trailer['report']['file_info']['rows'] == ROWS
+
+
+@pytest.mark.parametrize('query, headers', [
+    ('&format=arrow', {}),
+    ('&format=parquet', {}),
+    ('', {'Accept': 'application/vnd.apache.arrow.stream'}),
+    ('', {'Accept': 'application/vnd.apache.parquet'}),
+])
+def test_ndjson_rejects_conflicting_format(post, query, headers):
+    response = post(f'/process?cache=0&stream=ndjson{query}', CSV, 'chunks.csv', headers=headers)
+    assert response.status_code == 406
+    assert response.get_json()['available_formats'] == ['json']
+
+
+@pytest.fixture
+def busy_pool(monkeypatch):
+    """只有一个名额的进程池（流式处理不启动子进程）"""
+    pool = app_module.ProcessingPool(max_workers=1, queue_limit=1)
+    monkeypatch.setattr(app_module, 'processing_pool', pool)
+    return pool
+
+
+@pytest.mark.parametrize('query', ['stream=ndjson', 'chunked=1'])
+def test_streaming_rejected_when_pool_full(post, busy_pool, query):
+    release = busy_pool.reserve()
+    response = post(f'/process?cache=0&{query}', CSV, 'chunks.csv')
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '5'
+    assert busy_pool.stats['rejected'] == 1
+
+    release()
+    response = post(f'/process?cache=0&{query}', CSV, 'chunks.csv')
+    assert response.status_code == 200
+    response.get_data()
+    response.close()
+    # 响应关闭后名额归还
+    busy_pool.reserve()()
+
+
+def test_streaming_unmapped_columns_releases_slot(post, busy_pool):
+    response = post('/process?cache=0&stream=ndjson', '甲,乙\n1,2\n'.encode('utf-8'), 'unknown.csv')
+    assert response.status_code == 400
+    busy_pool.reserve()()
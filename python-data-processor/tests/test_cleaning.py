@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+"""整列清洗：clean_text_series / clean_numeric_series 与逐格的 clean_value / clean_numeric_value 一致"""
+
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app import ExcelFieldMapper, clean_numeric_series, clean_text_series
+
+MIXED = [
+    '张三', '  李四 ', '-王五-', '__', '', '   ', None, np.nan, '　赵六　', '\t-_x_-\n',
+    98, 98.5, -3, 0, 0.0, True, '98分', '缺考', '１２０', '1-2', '+5', '-', '.', '1e3', '1,000', 'NaN', 'inf',
+]
+
+SERIES = {
+    'mixed': pd.Series(MIXED, dtype=object),
+    'text': pd.Series(['a', ' b', 'c-', None, '', '_d_'], dtype=object),
+    'int': pd.Series([1, 2, 3], dtype='int64'),
+    'float': pd.Series([1.5, np.nan, -0.0], dtype='float64'),
+    'nullable_int': pd.Series([1, None, 3], dtype='Int64'),
+    'string': pd.Series(['98分', None, ' 7 '], dtype='string'),
+    'empty': pd.Series([], dtype=object),
+    'all_missing': pd.Series([None, np.nan, None], dtype=object),
+}
+
+
+def _same_number(actual, expected):
+    if expected is None:
+        return math.isnan(actual)
+    return actual == expected
+
+
+@pytest.mark.parametrize('name', SERIES)
+def test_text_matches_clean_value(name):
+    series = SERIES[name]
+    mapper = ExcelFieldMapper()
+    assert clean_text_series(series).tolist() == [mapper.clean_value(value) for value in series]
+
+
+@pytest.mark.parametrize('name', SERIES)
+def test_numeric_matches_clean_numeric_value(name):
+    series = SERIES[name]
+    mapper = ExcelFieldMapper()
+    cleaned = clean_numeric_series(series)
+    assert cleaned.dtype == np.float64
+    expected = [mapper.clean_numeric_value(value) for value in series]
+    assert all(_same_number(actual, value) for actual, value in zip(cleaned.tolist(), expected))
+
+
+def test_index_preserved():
+    series = pd.Series(['1', 'x', None], index=[10, 20, 30], dtype=object)
+    assert list(clean_text_series(series).index) == [10, 20, 30]
+    assert list(clean_numeric_series(series).index) == [10, 20, 30]
+
+
+def test_text_stats():
+    stats = {}
+    clean_text_series(pd.Series([' a ', 'b', '', None, '--'], dtype=object), stats)
+    assert stats == {'total': 5, 'missing': 1, 'nulled': 2, 'coerced': 1}
+
+
+def test_numeric_stats_accumulate():
+    stats = {}
+    clean_numeric_series(pd.Series(['98分', '缺考', 90, None], dtype=object), stats)
+    clean_numeric_series(pd.Series([1.0, np.nan]), stats)
+    assert stats == {'total': 6, 'missing': 2, 'nulled': 1, 'coerced': 1}
+
+
+def test_long_format_matches_row_by_row():
+    df = pd.DataFrame({
+        '学号': ['S1', 2, None, ' S4 '],
+        '姓名': ['张三', '', '-李四-', np.nan],
+        '科目': ['语文', '数学', None, '英语'],
+        '成绩': [98, '缺考', '98分', None],
+    })
+    mapper = ExcelFieldMapper()
+    column_mapping = mapper.map_columns(df)
+    expected = []
+    for _, row in df.iterrows():
+        record = {field: mapper.clean_value(row[col]) for col, field in column_mapping.items()}
+        record.setdefault('subject', '总分')
+        expected.append(record)
+    assert mapper.process_long_format(df, column_mapping) == expected
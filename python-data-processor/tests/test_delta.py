@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""增量导入：新增、修改和删除的记录"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from delta_store import FingerprintStore, diff_fingerprints, record_fingerprints
+
+HEADER = '学号,姓名,班级,语文,数学,英语\n'
+ROWS = [f'S{i:02d},学生{i},1班,{80 + i},{90 - i},{70 + i}' for i in range(10)]
+
+
+def _csv(rows):
+    return (HEADER + '\n'.join(rows) + '\n').encode('utf-8')
+
+
+def _delta(post, rows, exam_id='exam-1'):
+    response = post(f'/process?delta=1&cache=0&exam_id={exam_id}', _csv(rows), '期末.csv')
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def test_first_import_inserts_everything(post):
+    body = _delta(post, ROWS, 'first')
+    assert body['delta']['baseline_at'] is None
+    assert body['delta']['inserted'] == body['delta']['total_records'] == 30
+    assert len(body['inserted']) == 30 and body['changed'] == [] and body['deleted'] == []
+
+
+def test_reimport_returns_only_edits(post):
+    _delta(post, ROWS, 'edits')
+    edited = list(ROWS)
+    edited[2] = 'S02,学生2,1班,99,87,72'        # 语文、数学修改
+    del edited[5]                               # S05 三科删除
+    edited.append('S10,学生10,2班,60,61,62')    # 新增三科
+    body = _delta(post, edited, 'edits')
+
+    assert {key: body['delta'][key] for key in ('inserted', 'changed', 'deleted', 'unchanged')} == {
+        'inserted': 3, 'changed': 2, 'deleted': 3, 'unchanged': 25
+    }
+    assert {(r['student_id'], r['subject'], r['score']) for r in body['changed']} == {
+        ('S02', '语文', 99.0), ('S02', '数学', 87.0)
+    }
+    assert {r['student_id'] for r in body['inserted']} == {'S10'}
+    assert sorted(body['deleted'], key=lambda r: r['subject']) == [
+        {'student_id': 'S05', 'subject': subject} for subject in ('数学', '英语', '语文')
+    ]
+
+
+def test_unchanged_reimport_is_empty(post):
+    _delta(post, ROWS, 'same')
+    body = _delta(post, list(reversed(ROWS)), 'same')
+    assert body['delta']['unchanged'] == 30
+    assert body['inserted'] == body['changed'] == body['deleted'] == []
+
+
+def test_imports_are_separate_per_exam(post):
+    _delta(post, ROWS, 'exam-a')
+    assert _delta(post, ROWS[:3], 'exam-b')['delta']['inserted'] == 9
+
+
+@pytest.mark.parametrize('exam_id, query, headers', [
+    ('format-arrow', '&format=arrow', {}),
+    ('accept-arrow', '', {'Accept': 'application/vnd.apache.arrow.stream'}),
+    ('accept-parquet', '', {'Accept': 'application/vnd.apache.parquet'}),
+])
+def test_rejects_columnar_formats(post, exam_id, query, headers):
+    response = post(f'/process?delta=1&cache=0&exam_id={exam_id}{query}', _csv(ROWS), '期末.csv', headers=headers)
+    assert response.status_code == 406
+    assert response.get_json()['available_formats'] == ['json']
+    # 被拒绝的请求不记为基准
+    assert _delta(post, ROWS, exam_id)['delta']['baseline_at'] is None
+
+
+def test_accepts_json(post):
+    response = post('/process?delta=1&cache=0&exam_id=accept-json', _csv(ROWS), '期末.csv',
+                    headers={'Accept': 'application/json'})
+    assert response.status_code == 200
+    assert response.get_json()['delta']['inserted'] == 30
+
+
+def test_fingerprints_ignore_column_order_and_number_repeats():
+    frame = pd.DataFrame({'student_id': ['S1', 'S1', 'S2'], 'subject': ['语文', '语文', '语文'], 'score': [1.0, 2.0, 3.0]})
+    fingerprints = record_fingerprints([frame])
+    assert fingerprints['occurrence'].tolist() == [0, 1, 0]
+    assert fingerprints['key_hash'].is_unique
+
+    reordered = record_fingerprints([frame[['score', 'subject', 'student_id']]])
+    assert (reordered['digest'] == fingerprints['digest']).all()
+    widened = record_fingerprints([frame.assign(name='张三')])
+    assert not (widened['digest'] == fingerprints['digest']).any()
+
+
+def test_diff_fingerprints():
+    previous = record_fingerprints([pd.DataFrame({'student_id': ['S1', 'S2', 'S3'], 'subject': ['语文'] * 3,
+                                                  'score': [1.0, 2.0, 3.0]})])
+    current = record_fingerprints([pd.DataFrame({'student_id': ['S4', 'S2', 'S1'], 'subject': ['语文'] * 3,
+                                                 'score': [4.0, 9.0, 1.0]})])
+    inserted, changed, deleted = diff_fingerprints(previous, current)
+    assert inserted.tolist() == [0] and changed.tolist() == [1]
+    assert deleted['student_id'].tolist() == ['S3']
+
+
+def test_store_versions_and_users(tmp_path):
+    store = FingerprintStore(str(tmp_path / 'delta.sqlite3'))
+    fingerprints = record_fingerprints([pd.DataFrame({'student_id': ['S1'], 'subject': ['语文'], 'score': [np.nan]})])
+    store.save('user-1', 'exam', 'v1', fingerprints)
+
+    meta, loaded = store.load('user-1', 'exam', 'v1')
+    assert meta['record_count'] == 1
+    assert loaded['key_hash'].tolist() == fingerprints['key_hash'].tolist()
+    assert store.load('user-1', 'exam', 'v2') is None
+    assert store.load('user-2', 'exam', 'v1') is None
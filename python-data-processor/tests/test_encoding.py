@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+"""CSV编码嗅探：BOM、样本严格解码、样本边界截断的多字节字符和样本之后才出现的非法字节"""
+
+import codecs
+import io
+
+import pytest
+
+from app import ENCODING_SAMPLE_SIZE, detect_csv_encoding, read_excel_file
+
+HEADER = '学号,姓名,班级,语文\n'
+ROWS = ''.join(f'E{i:03d},学生{i},初二(1)班,{80 + i % 20}\n' for i in range(30))
+
+
+def _read(data):
+    read_info = {}
+    df = read_excel_file(io.BytesIO(data), read_info, filename='成绩.csv')
+    return df, read_info['encoding']
+
+
+def test_gbk():
+    data = (HEADER + ROWS).encode('gbk')
+    detection = detect_csv_encoding(io.BytesIO(data))
+    assert (detection['encoding'], detection['method']) == ('gbk', 'sample')
+
+    df, encoding = _read(data)
+    assert (encoding['encoding'], encoding['method']) == ('gbk', 'sample')
+    assert list(df.columns) == ['学号', '姓名', '班级', '语文']
+    assert df['姓名'].iloc[3] == '学生3'
+
+
+def test_utf8_bom():
+    data = codecs.BOM_UTF8 + (HEADER + ROWS).encode('utf-8')
+    detection = detect_csv_encoding(io.BytesIO(data))
+    assert (detection['encoding'], detection['method']) == ('utf-8-sig', 'bom')
+
+    df, _ = _read(data)
+    assert df.columns[0] == '学号'
+
+
+def test_plain_utf8():
+    detection = detect_csv_encoding(io.BytesIO((HEADER + ROWS).encode('utf-8')))
+    assert (detection['encoding'], detection['method']) == ('utf-8', 'sample')
+
+
+@pytest.mark.parametrize('encoding, char', [('utf-8', '语'), ('gbk', '语')])
+def test_character_split_at_sample_boundary(encoding, char):
+    # 填充到样本末尾只剩多字节字符的第一个字节
+    prefix = (HEADER.encode(encoding) + b'E000,')
+    padding = b'x' * (ENCODING_SAMPLE_SIZE - len(prefix) - 1)
+    data = prefix + padding + (char * 3 + ',1班,90\n').encode(encoding) + ROWS.encode(encoding)
+    assert data[ENCODING_SAMPLE_SIZE - 1:ENCODING_SAMPLE_SIZE + 1] == char.encode(encoding)[:2]
+
+    detection = detect_csv_encoding(io.BytesIO(data))
+    assert detection['sample_bytes'] == ENCODING_SAMPLE_SIZE
+    assert (detection['encoding'], detection['method']) == (encoding, 'sample')
+
+    df, read_encoding = _read(data)
+    assert read_encoding['encoding'] == encoding
+    assert df['姓名'].iloc[0] == 'x' * len(padding) + char * 3
+
+
+def test_fallback_after_sample():
+    # 样本内只有ASCII（按UTF-8解码成功），GBK字符出现在样本之后
+    filler = ''.join(f'E{i:05d},student{i},class1,{i % 100}\n' for i in range(3000))
+    assert len(filler) > ENCODING_SAMPLE_SIZE
+    data = b'id,name,class,score\n' + filler.encode('ascii') + '张三,李四,一班,90\n'.encode('gbk')
+    detection = detect_csv_encoding(io.BytesIO(data))
+    assert (detection['encoding'], detection['method']) == ('utf-8', 'sample')
+
+    df, encoding = _read(data)
+    assert (encoding['encoding'], encoding['method']) == ('gbk', 'fallback')
+    assert df['name'].iloc[-1] == '李四'
+
+
+def test_undecodable():
+    data = b'id,name\n1,\xff\xfe\xff\n'
+    assert detect_csv_encoding(io.BytesIO(data))['encoding'] is None
+    with pytest.raises(ValueError, match='编码'):
+        _read(data)
@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+"""表头定位：标题行、多行表头，以及不能把第一行数据并入表头"""
+
+import app
+
+# 表头中有空单元格，第一行数据全是文本
+TRAILING_BLANK_CSV = '学号,姓名,班级,语文,数学,\nS001,张三,一班,A,B+,转学\nS002,李四,二班,B,A,\n'
+BLANK_MIDDLE_CSV = '学号,姓名,,科目,成绩\nS1,张三,一班,语文,缺考\nS2,李四,二班,数学,88\n'
+
+
+def _rows(text):
+    return [line.split(',') for line in text.splitlines()]
+
+
+def test_title_row_skipped():
+    rows = [['高一期末考试成绩', None, None], ['学号', '姓名', '语文'], ['S1', '张三', 90]]
+    assert app.locate_header(rows) == (1, 1)
+
+
+def test_two_level_header():
+    rows = [
+        ['期末成绩单', None, None, None, None, None],
+        ['学号', '姓名', '语文', None, '数学', None],
+        [None, None, '成绩', '排名', '成绩', '排名'],
+        ['S1', '张三', 90, 3, 95, 1],
+    ]
+    assert app.locate_header(rows) == (1, 2)
+    assert app.flatten_header(rows[1:3])[:4] == ['学号', '姓名', '语文成绩', '语文排名']
+
+
+def test_text_data_row_not_merged_into_header():
+    assert app.locate_header(_rows(TRAILING_BLANK_CSV)) == (0, 1)
+    assert app.locate_header(_rows(BLANK_MIDDLE_CSV)) == (0, 1)
+
+
+def test_process_keeps_first_text_row(post):
+    response = post('/process?cache=0', TRAILING_BLANK_CSV.encode('utf-8'), '成绩.csv')
+    body = response.get_json()
+    assert response.status_code == 200
+    assert body['report']['file_info']['header']['rows'] == 1
+    assert [record['student_id'] for record in body['data']] == ['S001', 'S002']
+    assert body['data'][0]['chinese'] == 'A' and body['data'][0]['math'] == 'B+'
+
+
+def test_process_keeps_first_row_under_blank_header(post):
+    response = post('/process?cache=0', BLANK_MIDDLE_CSV.encode('utf-8'), '成绩.csv')
+    body = response.get_json()
+    assert response.status_code == 200
+    assert body['report']['file_info']['header']['rows'] == 1
+    assert [(record['student_id'], record['name']) for record in body['data']] == [('S1', '张三'), ('S2', '李四')]
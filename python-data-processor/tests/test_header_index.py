@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+"""表头索引：映射结果和置信度与改造前逐个别名调用 fuzzy_match 的实现一致"""
+
+import random
+
+import pandas as pd
+
+from app import FIELD_MAPPINGS, HEADER_MATCH_THRESHOLD, ExcelFieldMapper, HeaderIndex, get_header_index
+
+
+def legacy_map_columns(mapper, columns):
+    """改造前的 map_columns：每列对每个字段类型调用 fuzzy_match"""
+    column_mapping, confidence_scores = {}, {}
+    for col in columns:
+        col_str = str(col).strip()
+        best_field, best_score = None, 0
+        for field_type, candidates in mapper.field_mappings.items():
+            _, score = mapper.fuzzy_match(col_str, candidates)
+            if score > best_score and score >= HEADER_MATCH_THRESHOLD:
+                best_field, best_score = field_type, score
+        if best_field:
+            column_mapping[col_str] = best_field
+            confidence_scores[col_str] = best_score
+    return column_mapping, confidence_scores
+
+
+def _headers():
+    aliases = [alias for candidates in FIELD_MAPPINGS.values() for alias in candidates]
+    decorated = [f'{alias}{suffix}' for alias in aliases for suffix in ('成绩', '(满分150)', ' ', '1', '_分数')]
+    prefixed = [f'{prefix}{alias}' for alias in aliases for prefix in ('高一', '期末', 'A ')]
+    fragments = [alias[:1] for alias in aliases] + [alias[1:] for alias in aliases if len(alias) > 1]
+    rng = random.Random(7)
+    noise = [''.join(rng.choice('学号姓名班级语文数学英总分排名 abcID_-()（）0123') for _ in range(rng.randint(0, 8)))
+             for _ in range(500)]
+    return aliases + decorated + prefixed + fragments + noise + ['', ' ', 'Unnamed: 3', '2024', 'NAME', 'Class_Name']
+
+
+def test_map_columns_matches_fuzzy_match():
+    mapper = ExcelFieldMapper()
+    headers = _headers()
+    # 每批各自成列，避免同名列
+    for start in range(0, len(headers), 200):
+        columns = list(dict.fromkeys(headers[start:start + 200]))
+        df = pd.DataFrame(columns=columns)
+        assert mapper.map_columns_with_confidence(df) == legacy_map_columns(mapper, columns)
+
+
+def test_custom_field_mappings():
+    mapper = ExcelFieldMapper()
+    mapper.field_mappings['student_id'].append('校内编号')
+    mapper.field_mappings['remark'] = ['备注', '说明']
+    columns = ['校内编号', '备注信息', '说明', '姓名']
+    assert mapper.map_columns_with_confidence(pd.DataFrame(columns=columns)) == legacy_map_columns(mapper, columns)
+    # 实例上的扩展不影响默认索引
+    assert ExcelFieldMapper().map_columns(pd.DataFrame(columns=['校内编号'])) == {}
+
+
+def test_index_is_shared_and_cache_bounded():
+    assert get_header_index(FIELD_MAPPINGS) is get_header_index({k: list(v) for k, v in FIELD_MAPPINGS.items()})
+    index = HeaderIndex(FIELD_MAPPINGS, cache_size=4)
+    for header in ['学号', '姓名', '语文', '数学', '英语', '学号']:
+        index.resolve(header)
+    info = index.cache_info()
+    assert info.maxsize == 4 and info.currsize == 4
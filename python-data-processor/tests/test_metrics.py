@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""运行指标：Prometheus 文本格式（0.0.4）的转义和结构"""
+
+import re
+
+import pytest
+
+from metrics import CONTENT_TYPE, MetricsRegistry
+
+NAME = r'[a-zA-Z_:][a-zA-Z0-9_:]*'
+SAMPLE = re.compile(rf'^({NAME})(?:\{{(.*)\}})? (\S+)$')
+LABEL = re.compile(r'([a-zA-Z_][a-zA-Z0-9_]*)="((?:[^"\\\n]|\\[\\"n])*)"(?:,|$)')
+ESCAPES = {'\\\\': '\\', '\\"': '"', '\\n': '\n'}
+
+
+def _unescape(value):
+    return re.sub(r'\\[\\"n]', lambda match: ESCAPES[match.group(0)], value)
+
+
+def parse_exposition(text):
+    """按文本格式解析输出：{指标名: {'type', 'help', 'samples': [(样本名, 标签, 值)]}}，格式不对时断言失败"""
+    assert text.endswith('\n')
+    families, current = {}, None
+    for line in text[:-1].split('\n'):
+        if line.startswith('# HELP '):
+            name, help_text = line[len('# HELP '):].split(' ', 1)
+            current = families.setdefault(name, {'samples': []})
+            current['help'] = re.sub(r'\\[\\n]', lambda match: ESCAPES[match.group(0)], help_text)
+            continue
+        if line.startswith('# TYPE '):
+            name, kind = line[len('# TYPE '):].split(' ')
+            assert kind in ('counter', 'gauge', 'histogram', 'untyped')
+            families[name]['type'] = kind
+            continue
+
+        match = SAMPLE.match(line)
+        assert match, f'无法解析的样本行: {line!r}'
+        name, rendered, value = match.groups()
+        labels, position = {}, 0
+        while rendered and position < len(rendered):
+            label = LABEL.match(rendered, position)
+            assert label, f'无法解析的标签: {rendered[position:]!r}'
+            labels[label.group(1)] = _unescape(label.group(2))
+            position = label.end()
+        assert current is not None and re.fullmatch(rf'{re.escape(next(reversed(families)))}(_bucket|_sum|_count)?', name)
+        current['samples'].append((name, labels, float(value)))
+    return families
+
+
+def test_label_values_are_escaped():
+    registry = MetricsRegistry()
+    counter = registry.counter('demo_total', '演示', ['path'])
+    value = 'C:\\成绩\\"期末"\n第二行'
+    counter.inc(path=value)
+
+    text = registry.render()
+    assert 'demo_total{path="C:\\\\成绩\\\\\\"期末\\"\\n第二行"} 1\n' in text
+    assert parse_exposition(text)['demo_total']['samples'] == [('demo_total', {'path': value}, 1.0)]
+
+
+def test_help_text_escapes_backslash_and_newline():
+    registry = MetricsRegistry()
+    registry.counter('demo_total', '路径 a\\b\n第二行 "引号"')
+
+    text = registry.render()
+    assert '# HELP demo_total 路径 a\\\\b\\n第二行 "引号"\n' in text
+    assert parse_exposition(text)['demo_total']['help'] == '路径 a\\b\n第二行 "引号"'
+
+
+def test_histogram_exposition():
+    registry = MetricsRegistry()
+    histogram = registry.histogram('demo_seconds', '耗时', ['stage'], buckets=(0.1, 1))
+    for value in (0.05, 0.5, 5):
+        histogram.observe(value, stage='读取')
+
+    family = parse_exposition(registry.render())['demo_seconds']
+    assert family['type'] == 'histogram'
+    assert family['samples'] == [
+        ('demo_seconds_bucket', {'stage': '读取', 'le': '0.1'}, 1.0),
+        ('demo_seconds_bucket', {'stage': '读取', 'le': '1'}, 2.0),
+        ('demo_seconds_bucket', {'stage': '读取', 'le': '+Inf'}, 3.0),
+        ('demo_seconds_sum', {'stage': '读取'}, 5.55),
+        ('demo_seconds_count', {'stage': '读取'}, 3.0),
+    ]
+
+
+def test_labels_must_match_declaration():
+    counter = MetricsRegistry().counter('demo_total', '演示', ['path'])
+    with pytest.raises(ValueError):
+        counter.inc(other='x')
+
+
+def test_metrics_endpoint(client, post):
+    post('/process?cache=0', '学号,姓名,语文\nM1,张三,90\n'.encode('utf-8'), '指标.csv')
+    response = client.get('/metrics')
+
+    assert response.status_code == 200
+    assert response.headers['Content-Type'] == CONTENT_TYPE
+    families = parse_exposition(response.get_data(as_text=True))
+    assert families['edu_http_requests_total']['type'] == 'counter'
+    assert ('edu_http_requests_total', {'endpoint': 'process_file', 'method': 'POST', 'status': '200'}) in [
+        (name, labels) for name, labels, _ in families['edu_http_requests_total']['samples']
+    ]
+    assert {labels['cache'] for _, labels, _ in families['edu_cache']['samples']} >= {'result', 'auth', 'header'}
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""输出格式：?format= 与 Accept 协商、列式响应和 Vary 头"""
+
+import io
+import json
+
+import pytest
+
+import app as app_module
+
+CSV = ('学号,姓名,班级,语文,数学\n' + ''.join(
+    f'F{i:03d},学生{i},{i % 2 + 1}班,{70 + i},{95 - i}\n' for i in range(12)
+)).encode('utf-8')
+
+
+@pytest.fixture
+def no_pyarrow(monkeypatch):
+    monkeypatch.setattr(app_module, 'PYARROW_AVAILABLE', False)
+
+
+@pytest.fixture
+def pyarrow():
+    module = pytest.importorskip('pyarrow')
+    assert app_module.PYARROW_AVAILABLE
+    return module
+
+
+@pytest.mark.parametrize('query, headers', [
+    ('', {}),
+    ('', {'Accept': '*/*'}),
+    ('', {'Accept': 'text/html'}),
+    ('&format=json', {'Accept': app_module.ARROW_STREAM_MIMETYPE}),
+])
+def test_json_responses(post, query, headers):
+    response = post(f'/process?cache=0{query}', CSV, '格式.csv', headers=headers)
+    assert response.status_code == 200
+    assert response.mimetype == 'application/json'
+    assert 'Accept' in response.vary
+    assert response.get_json()['success'] is True
+
+
+def test_unavailable_format_without_pyarrow(post, no_pyarrow):
+    assert app_module.available_output_formats() == ['json']
+    response = post('/process?cache=0&format=arrow', CSV, '格式.csv')
+    assert response.status_code == 406
+    assert response.get_json()['available_formats'] == ['json']
+
+    # Accept 无法满足时回退为JSON
+    response = post('/process?cache=0', CSV, '格式.csv', headers={'Accept': app_module.PARQUET_MIMETYPE})
+    assert response.status_code == 200
+    assert response.mimetype == 'application/json'
+
+
+def test_unknown_format(post):
+    response = post('/process?cache=0&format=xml', CSV, '格式.csv')
+    assert response.status_code == 406
+
+
+def _arrow_table(pyarrow, response):
+    import pyarrow.ipc
+    return pyarrow.ipc.open_stream(io.BytesIO(response.data)).read_all()
+
+
+@pytest.mark.parametrize('query, headers', [
+    ('&format=arrow', {}),
+    ('', {'Accept': 'application/vnd.apache.arrow.stream'}),
+    ('', {'Accept': 'application/json;q=0.5, application/vnd.apache.arrow.stream'}),
+])
+def test_arrow_negotiation(post, pyarrow, query, headers):
+    expected = post('/process?cache=0', CSV, '格式.csv').get_json()
+    response = post(f'/process?cache=0{query}', CSV, '格式.csv', headers=headers)
+
+    assert response.status_code == 200
+    assert response.mimetype == app_module.ARROW_STREAM_MIMETYPE
+    assert 'Accept' in response.vary
+    table = _arrow_table(pyarrow, response)
+    assert table.num_rows == len(expected['data'])
+    assert json.loads(table.schema.metadata[b'report'])['processing_stats'] == expected['report']['processing_stats']
+
+
+@pytest.mark.parametrize('query, headers', [
+    ('&format=parquet', {}),
+    ('', {'Accept': 'application/vnd.apache.parquet'}),
+    ('', {'Accept': 'application/x-parquet'}),
+])
+def test_parquet_round_trip(post, pyarrow, query, headers):
+    import pyarrow.parquet as pq
+
+    expected = post('/process?cache=0', CSV, '格式.csv').get_json()
+    response = post(f'/process?cache=0{query}', CSV, '格式.csv', headers=headers)
+
+    assert response.status_code == 200
+    assert response.mimetype == app_module.PARQUET_MIMETYPE
+    assert 'Accept' in response.vary
+    table = pq.read_table(io.BytesIO(response.data))
+    report = json.loads(table.schema.metadata[b'report'])
+    assert report['processing_stats'] == expected['report']['processing_stats']
+    assert report['file_info']['rows'] == 12
+
+    # 与 Arrow 响应的列和记录相同（数值列为数值类型，JSON中保持原文）
+    arrow = _arrow_table(pyarrow, post('/process?cache=0&format=arrow', CSV, '格式.csv'))
+    assert table.schema.remove_metadata() == arrow.schema.remove_metadata()
+    assert table.to_pylist() == arrow.to_pylist()
+    assert [record['student_id'] for record in table.to_pylist()] == [record['student_id'] for record in expected['data']]
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+"""结果缓存：内存LRU、磁盘层的读写和磁盘目录的权限检查"""
+
+import os
+import pickle
+import stat
+
+import pytest
+
+from result_cache import ResultCache
+
+
+def test_memory_lru_by_entries_and_bytes():
+    cache = ResultCache(max_entries=2, max_bytes=100)
+    cache.put('a', 1, 10)
+    cache.put('b', 2, 10)
+    cache.get('a')
+    cache.put('c', 3, 10)
+    assert cache.get('b') is None and cache.get('a') == 1
+    cache.put('d', 4, 95)
+    assert cache.snapshot()['entries'] == 1 and cache.get('d') == 4
+
+
+def test_disk_tier_survives_restart(tmp_path):
+    directory = str(tmp_path / 'cache')
+    ResultCache(max_entries=0, disk_dir=directory).put('key', {'rows': 3}, 10)
+    cache = ResultCache(disk_dir=directory)
+    assert cache.contains('key')
+    assert cache.get('key') == {'rows': 3}
+    assert cache.snapshot()['disk_hits'] == 1
+
+
+def test_disk_dir_created_private(tmp_path):
+    directory = tmp_path / 'cache'
+    ResultCache(disk_dir=str(directory))
+    assert stat.S_IMODE(directory.stat().st_mode) == 0o700
+
+
+def test_existing_open_dir_tightened(tmp_path):
+    directory = tmp_path / 'shared'
+    directory.mkdir()
+    directory.chmod(0o777)
+    cache = ResultCache(disk_dir=str(directory))
+    assert cache.disk_dir == str(directory)
+    assert stat.S_IMODE(directory.stat().st_mode) == 0o700
+
+
+@pytest.mark.skipif(not hasattr(os, 'getuid') or os.getuid() != 0, reason='需要root修改属主')
+def test_foreign_dir_and_files_not_loaded(tmp_path):
+    directory = tmp_path / 'foreign'
+    directory.mkdir(mode=0o700)
+    os.chown(directory, 65534, 65534)
+    assert ResultCache(disk_dir=str(directory)).disk_dir is None
+
+    own = tmp_path / 'own'
+    cache = ResultCache(max_entries=0, disk_dir=str(own))
+    path = own / f'{"k" * 64}.pkl'
+    path.write_bytes(pickle.dumps((1, 'planted')))
+    os.chown(path, 65534, 65534)
+    assert cache.get('k' * 64) is None
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+"""多工作表模式：各工作表任务共用一份落盘的上传文件"""
+
+import io
+import os
+
+import pytest
+from openpyxl import Workbook
+
+import app as app_module
+
+
+def make_workbook():
+    workbook = Workbook()
+    for index, name in enumerate(['一班', '二班']):
+        sheet = workbook.active if index == 0 else workbook.create_sheet()
+        sheet.title = name
+        sheet.append(['学号', '姓名', '语文', '数学'])
+        for i in range(3):
+            sheet.append([f'S{index}{i}', f'学生{index}{i}', 80 + i, 90 - i])
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
+
+
+class RecordingPool(app_module.ProcessingPool):
+    """启用状态的进程池，任务在当前进程中执行并记录参数"""
+
+    def __init__(self):
+        super().__init__(max_workers=1)
+        self.sources = []
+
+    def run_all(self, calls, timeout=None, wait=None):
+        results = []
+        for func, *args in calls:
+            self.sources.append(args[0])
+            results.append(func(*args))
+        return results
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    recording = RecordingPool()
+    monkeypatch.setattr(app_module, 'processing_pool', recording)
+    return recording
+
+
+@pytest.mark.parametrize('path', ['/process?cache=0&sheets=all', '/analyze?cache=0&sheets=all'])
+def test_sheet_tasks_share_spooled_path(post, pool, path):
+    response = post(path, make_workbook(), '成绩.xlsx')
+
+    assert response.status_code == 200
+    assert len(pool.sources) == 2
+    assert all(isinstance(source, str) for source in pool.sources)
+    assert len(set(pool.sources)) == 1
+    assert not os.path.exists(pool.sources[0])
+
+
+def test_sheet_processing_merges_records(post, pool):
+    body = post('/process?cache=0&sheets=all', make_workbook(), '成绩.xlsx').get_json()
+
+    assert [sheet['name'] for sheet in body['report']['sheets']] == ['一班', '二班']
+    assert sorted(record['sheet'] for record in body['data']) == ['一班'] * 3 + ['二班'] * 3
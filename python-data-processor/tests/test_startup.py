@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+"""启动：认证、Excel解析等模块按需加载；/health 不查询各组件"""
+
+import json
+import os
+import subprocess
+import sys
+
+import app as app_module
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_import_defers_optional_modules():
+    code = ('import json, sys, app; '
+            "print(json.dumps([m for m in ('jwt', 'requests', 'openpyxl') if m in sys.modules]))")
+    completed = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, cwd=SERVICE_DIR,
+                               env={**os.environ, 'PROCESS_POOL_WORKERS': '0'}, check=True)
+    assert json.loads(completed.stdout.strip().splitlines()[-1]) == []
+
+
+def test_health_is_trivial(client, monkeypatch):
+    def fail():
+        raise AssertionError('/health 不应查询组件状态')
+
+    for component in ('token_cache', 'result_cache', 'processing_pool', 'batch_runner', 'delta_store'):
+        monkeypatch.setattr(getattr(app_module, component), 'snapshot', fail)
+
+    response = client.get('/health')
+    assert response.status_code == 200
+    assert set(response.get_json()) == {'status', 'service', 'version', 'timestamp'}
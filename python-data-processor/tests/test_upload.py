@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+"""上传文件：小文件在内存中解析，超过 UPLOAD_SPOOL_THRESHOLD 才写入临时文件"""
+
+import io
+import os
+
+import pytest
+from werkzeug.datastructures import FileStorage
+
+import app as app_module
+from app import UploadedFile
+
+CSV = ('学号,姓名,班级,语文,数学\n' + ''.join(
+    f'U{i:03d},学生{i},1班,{70 + i % 30},{95 - i % 20}\n' for i in range(50)
+)).encode('utf-8')
+
+
+def _upload(data=CSV, filename='成绩.csv'):
+    return UploadedFile(FileStorage(io.BytesIO(data), filename=filename))
+
+
+def test_default_threshold_below_max_file_size():
+    assert 0 < app_module.UPLOAD_SPOOL_THRESHOLD < app_module.MAX_FILE_SIZE
+
+
+def test_small_upload_stays_in_memory(monkeypatch):
+    monkeypatch.setattr(app_module, 'UPLOAD_SPOOL_THRESHOLD', len(CSV))
+    upload = _upload()
+    assert isinstance(upload.source, io.BytesIO)
+    assert upload.temp_path is None
+    assert upload.size_bytes == len(CSV)
+    assert upload.source.getvalue() == CSV
+    upload.close()
+
+
+def test_large_upload_is_spooled(monkeypatch):
+    monkeypatch.setattr(app_module, 'UPLOAD_SPOOL_THRESHOLD', len(CSV) - 1)
+    upload = _upload()
+    assert upload.source == upload.temp_path
+    assert upload.temp_path.endswith('.csv')
+    assert upload.size_bytes == len(CSV)
+    with open(upload.temp_path, 'rb') as f:
+        assert f.read() == CSV
+
+    upload.close()
+    assert upload.temp_path is None
+    assert not os.path.exists(upload.source)
+
+
+@pytest.mark.parametrize('threshold, spooled', [(len(CSV), False), (0, True)])
+def test_process_reports_size_for_both_paths(post, monkeypatch, tmp_path, threshold, spooled):
+    monkeypatch.setattr(app_module, 'UPLOAD_SPOOL_THRESHOLD', threshold)
+    monkeypatch.setattr(app_module, 'UPLOAD_FOLDER', str(tmp_path))
+    temp_paths = []
+    close = UploadedFile.close
+    monkeypatch.setattr(UploadedFile, 'close', lambda self: temp_paths.append(self.temp_path) or close(self))
+
+    body = post('/process?cache=0', CSV, '成绩.csv').get_json()
+    assert body['success'] is True
+    assert body['report']['file_info']['size_bytes'] == len(CSV)
+    assert body['report']['processing_stats']['total_records'] == 50
+    assert (temp_paths[0] is not None) == spooled
+    assert list(tmp_path.iterdir()) == []
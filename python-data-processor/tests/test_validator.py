@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+"""列式验证：缺失字段、重复记录和统计与逐条检查一致，错误按规则合并并限制样例数"""
+
+import numpy as np
+import pandas as pd
+
+from app import StreamingValidator, validate_processed_data
+
+
+def legacy_missing(records, fields=('student_id', 'name')):
+    """改造前逐条检查的缺失字段：(记录序号, 字段)"""
+    return [(i + 1, field) for i, record in enumerate(records) for field in fields if not record.get(field)]
+
+
+def _records(rows=60, seed=3):
+    rng = np.random.default_rng(seed)
+    records = []
+    for i in range(rows):
+        for subject in ('语文', '数学'):
+            records.append({
+                'student_id': None if rng.random() < 0.1 else ('' if rng.random() < 0.05 else f'S{i % 40}'),
+                'name': None if rng.random() < 0.1 else f'学生{i}',
+                'subject': subject,
+                'score': float(rng.integers(0, 150)),
+            })
+    return records
+
+
+def _missing_pairs(result, sample_rows):
+    pairs = []
+    for detail in result['error_details']:
+        assert detail['rule'] == 'missing_field'
+        assert len(detail['rows']) == min(detail['count'], sample_rows)
+        pairs.extend((row, detail['field']) for row in detail['rows'])
+    return sorted(pairs)
+
+
+def test_matches_per_record_checks():
+    records = _records()
+    result = StreamingValidator(sample_rows=1000).update(records).result()
+    expected = legacy_missing(records)
+
+    assert result['valid'] is False
+    assert _missing_pairs(result, 1000) == sorted(expected)
+    assert result['total_records'] == len(records)
+    assert result['unique_students'] == len({r['student_id'] for r in records if r['student_id']})
+
+
+def test_errors_grouped_and_capped():
+    records = [{'student_id': None, 'name': None, 'subject': '语文'} for _ in range(500)]
+    result = StreamingValidator(sample_rows=10).update(records).result()
+
+    assert len(result['errors']) == 2
+    assert [detail['count'] for detail in result['error_details']] == [500, 500]
+    assert result['error_details'][0]['rows'] == list(range(1, 11))
+    assert result['errors'][0].endswith('等）')
+
+
+def test_duplicates_by_student_and_subject():
+    records = [
+        {'student_id': 'S1', 'name': '张三', 'subject': '语文'},
+        {'student_id': 'S1', 'name': '张三', 'subject': '数学'},
+        {'student_id': 'S1', 'name': '张三', 'subject': '语文'},
+        {'student_id': 'S2', 'name': '李四', 'subject': '语文'},
+    ]
+    result = StreamingValidator().update(records).result()
+
+    assert result['valid'] is True
+    assert result['warning_details'] == [
+        {'rule': 'duplicate_record', 'fields': ['student_id', 'subject'], 'count': 1, 'rows': [3]}
+    ]
+    assert result['unique_students'] == 2
+
+
+def test_chunks_accumulate_like_single_pass():
+    frame = pd.DataFrame(_records(200))
+    whole = StreamingValidator()
+    whole.update_frame(frame)
+    chunked = StreamingValidator()
+    for start in range(0, len(frame), 37):
+        chunked.update_frame(frame.iloc[start:start + 37].reset_index(drop=True))
+
+    assert chunked.result() == whole.result()
+    assert chunked.stats() == whole.stats()
+    assert whole.stats() == {
+        'total_records': len(frame),
+        'unique_students': frame['student_id'].replace('', None).dropna().nunique(),
+        'subjects_detected': 2,
+    }
+
+
+def test_missing_column_and_empty_input():
+    result = StreamingValidator().update([{'student_id': 'S1', 'subject': '语文'}]).result()
+    assert result['error_details'][0]['field'] == 'name'
+    assert validate_processed_data([]) == {'valid': False, 'errors': ['处理后的数据为空'], 'warnings': []}
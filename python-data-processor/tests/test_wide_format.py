@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+"""宽格式转换：列式实现与改造前的逐行实现输出一致"""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks'))
+
+from app import ExcelFieldMapper  # noqa: E402
+from bench_wide_format import legacy_process_wide_format, make_wide_frame  # noqa: E402
+
+
+def _mixed_frame():
+    return pd.DataFrame({
+        '学号': ['2024001', 2024002, None, '  ', '-2024005-', 2024006.0],
+        '姓名': ['张三', None, '  李四 ', '__王五', '', np.nan],
+        '班级': ['高一(1)班', '高一(1)班', None, '-', '高一(2)班', '高一(2)班'],
+        '语文': [98, '缺考', None, '98分', '１２０', ''],
+        '数学': [120.5, '1-2', np.nan, ' 87 ', '-5', 0],
+        '英语': ['95分', 110, 'abc', None, 100, '100.0'],
+        '总分': [313, None, '', '200分', 0, 1],
+    })
+
+
+def _numeric_frame():
+    # 全部为数值列时逐行读取会把整行提升为float
+    return pd.DataFrame({
+        '学号': [1, 2, 3],
+        '语文': [90, 80, np.nan],
+        '数学': [100.5, np.nan, 70],
+        '英语': [1, 2, 3],
+    })
+
+
+FRAMES = {
+    'synthetic': lambda: make_wide_frame(500),
+    'mixed': _mixed_frame,
+    'numeric': _numeric_frame,
+    'empty': lambda: _mixed_frame().iloc[:0],
+    'no_subjects': lambda: _mixed_frame()[['学号', '姓名', '班级']],
+    'all_missing_scores': lambda: _mixed_frame().assign(语文=None, 数学=None, 英语=None),
+}
+
+
+@pytest.mark.parametrize('name', FRAMES)
+def test_matches_row_by_row(name):
+    df = FRAMES[name]()
+    mapper = ExcelFieldMapper()
+    column_mapping = mapper.map_columns(df)
+    assert mapper.process_wide_format(df, column_mapping) == legacy_process_wide_format(mapper, df, column_mapping)
+
+
+def test_duplicate_base_field_uses_last_column():
+    df = pd.DataFrame({'学号': ['A1', 'A2'], '考号': ['K1', 'K2'], '语文': [1, 2], '数学': [3, 4], '英语': [5, 6]})
+    mapper = ExcelFieldMapper()
+    column_mapping = mapper.map_columns(df)
+    records = mapper.process_wide_format(df, column_mapping)
+    assert records == legacy_process_wide_format(mapper, df, column_mapping)
+    assert records[0]['student_id'] == 'K1'
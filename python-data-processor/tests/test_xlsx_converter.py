@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+"""scripts/xlsx-to-csv-converter.py：标准库 iterparse 读取与 openpyxl 一致；批量模式的输出路径和跳过未变化的文件"""
+
+import importlib.util
+import os
+import sys
+import zipfile
+
+import pytest
+
+pytest.importorskip('openpyxl')
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(SERVICE_DIR, 'benchmarks'))
+
+from synthetic import generate, make_exam_frame  # noqa: E402
+
+CONVERTER = os.path.join(os.path.dirname(SERVICE_DIR), 'scripts', 'xlsx-to-csv-converter.py')
+spec = importlib.util.spec_from_file_location('xlsx_converter', CONVERTER)
+converter = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(converter)
+
+MAIN = 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'
+RELS = 'http://schemas.openxmlformats.org/package/2006/relationships'
+DOC_RELS = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+
+# 富文本共享字符串（分段 <r>、带注音 <rPh>）、普通共享字符串
+SHARED_STRINGS = f'''<?xml version="1.0" encoding="UTF-8"?>
+<sst xmlns="{MAIN}" count="4" uniqueCount="4">
+<si><t>学号</t></si>
+<si><r><t>语</t></r><r><rPr><b/></rPr><t>文</t></r><rPh sb="0" eb="2"><t>ゴブン</t></rPh></si>
+<si><t xml:space="preserve"> 张 三 </t></si>
+<si><r><t>总</t></r><r><t>分</t></r></si>
+</sst>'''
+
+# 第3、4行缺失，第5行只有 C、E 两列；D2 为带缓存结果的公式，F6 为没有缓存结果的公式
+SHEET = f'''<?xml version="1.0" encoding="UTF-8"?>
+<worksheet xmlns="{MAIN}"><dimension ref="A1:F6"/><sheetData>
+<row r="1"><c r="A1" t="s"><v>0</v></c><c r="B1" t="s"><v>1</v></c><c r="D1" t="s"><v>3</v></c></row>
+<row r="2"><c r="A2" t="s"><v>2</v></c><c r="B2"><v>95.5</v></c><c r="C2" t="b"><v>1</v></c><c r="D2"><f>B2*2</f><v>191</v></c></row>
+<row r="5"><c r="C5" t="inlineStr"><is><r><t>内</t></r><r><t>联</t></r></is></c><c r="E5"><v>7</v></c></row>
+<row r="6"><c r="A6" t="str"><f>"缺"&amp;"考"</f><v>缺考</v></c><c r="F6"><f>SUM(B2:B5)</f><v/></c></row>
+</sheetData></worksheet>'''
+
+WORKBOOK_PARTS = {
+    '[Content_Types].xml': '''<?xml version="1.0" encoding="UTF-8"?>
+<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">
+<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>
+<Default Extension="xml" ContentType="application/xml"/>
+<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>
+<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>
+<Override PartName="/xl/sharedStrings.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sharedStrings+xml"/>
+</Types>''',
+    '_rels/.rels': f'''<?xml version="1.0" encoding="UTF-8"?>
+<Relationships xmlns="{RELS}">
+<Relationship Id="rId1" Type="{DOC_RELS}/officeDocument" Target="xl/workbook.xml"/>
+</Relationships>''',
+    'xl/workbook.xml': f'''<?xml version="1.0" encoding="UTF-8"?>
+<workbook xmlns="{MAIN}" xmlns:r="{DOC_RELS}"><sheets><sheet name="成绩" sheetId="1" r:id="rId1"/></sheets></workbook>''',
+    'xl/_rels/workbook.xml.rels': f'''<?xml version="1.0" encoding="UTF-8"?>
+<Relationships xmlns="{RELS}">
+<Relationship Id="rId1" Type="{DOC_RELS}/worksheet" Target="worksheets/sheet1.xml"/>
+<Relationship Id="rId2" Type="{DOC_RELS}/sharedStrings" Target="sharedStrings.xml"/>
+</Relationships>''',
+    'xl/sharedStrings.xml': SHARED_STRINGS,
+    'xl/worksheets/sheet1.xml': SHEET,
+}
+
+
+def write_workbook(path):
+    with zipfile.ZipFile(path, 'w') as package:
+        for name, content in WORKBOOK_PARTS.items():
+            package.writestr(name, content)
+    return path
+
+
+def convert(source, target, engine):
+    converter.convert_workbook(str(source), str(target), engine)
+    with open(target, encoding='utf-8') as f:
+        return f.read().splitlines()
+
+
+def test_iterparse_matches_openpyxl(tmp_path):
+    source = write_workbook(tmp_path / '成绩.xlsx')
+    rows = convert(source, tmp_path / 'xml.csv', 'xml')
+
+    assert rows == convert(source, tmp_path / 'openpyxl.csv', 'openpyxl')
+    assert rows == [
+        '学号,语文,,总分,,',
+        ' 张 三 ,95.5,True,191,,',
+        ',,,,,',
+        ',,,,,',
+        ',,内联,,7,',
+        '缺考,,,,,',
+    ]
+
+
+def test_synthetic_workbook_with_formulas(tmp_path):
+    source = tmp_path / '合成.xlsx'
+    generate(str(source), 30, formula_totals=True)
+    rows = convert(source, tmp_path / 'xml.csv', 'xml')
+    assert rows == convert(source, tmp_path / 'openpyxl.csv', 'openpyxl')
+    # 总分列输出缓存的计算结果而不是公式
+    assert [row.rsplit(',', 1)[1] for row in rows[1:]] == [f'{total:g}' for total in make_exam_frame(30)['总分']]
+
+
+def make_inputs(root):
+    """两个子目录中各有一个同名的工作簿"""
+    from openpyxl import Workbook
+
+    paths = []
+    for directory, score in (('a', 80), ('b', 90)):
+        workbook = Workbook()
+        workbook.active.append(['学号', '语文'])
+        workbook.active.append([f'{directory}01', score])
+        path = root / 'in' / directory / '成绩.xlsx'
+        path.parent.mkdir(parents=True)
+        workbook.save(path)
+        paths.append(path)
+    return paths
+
+
+def run_batch(monkeypatch, capsys, *args):
+    """以命令行参数运行一次批量转换，返回 (转换数, 跳过数)"""
+    monkeypatch.setattr(sys, 'argv', ['xlsx-to-csv-converter.py', *args, '--workers', '1'])
+    converter.main()
+    summary = capsys.readouterr().out.splitlines()
+    line = next(line for line in summary if line.startswith('📈'))
+    converted, skipped = (int(line.split(word)[1].split('个')[0]) for word in ('转换 ', '跳过 '))
+    return converted, skipped
+
+
+def test_glob_keeps_relative_paths(tmp_path, monkeypatch, capsys):
+    make_inputs(tmp_path)
+    monkeypatch.chdir(tmp_path)
+    assert run_batch(monkeypatch, capsys, 'in/*/成绩.xlsx', '--output-dir', 'out') == (2, 0)
+
+    with open(tmp_path / 'out' / 'a' / '成绩.csv', encoding='utf-8') as f:
+        assert f.read().splitlines() == ['学号,语文', 'a01,80']
+    with open(tmp_path / 'out' / 'b' / '成绩.csv', encoding='utf-8') as f:
+        assert f.read().splitlines() == ['学号,语文', 'b01,90']
+
+
+def test_glob_root():
+    assert converter.glob_root('in/*/成绩.xlsx') == converter.Path('in')
+    assert converter.glob_root('data/2024/**/*.xlsx') == converter.Path('data/2024')
+    assert converter.glob_root('*.xlsx') == converter.Path('.')
+
+
+@pytest.mark.parametrize('hash_mode', [False, True])
+def test_second_run_skips_unchanged(tmp_path, monkeypatch, capsys, hash_mode):
+    first, second = make_inputs(tmp_path)
+    args = [str(tmp_path / 'in'), '--output-dir', str(tmp_path / 'out')] + (['--hash'] if hash_mode else [])
+
+    assert run_batch(monkeypatch, capsys, *args) == (2, 0)
+    assert run_batch(monkeypatch, capsys, *args) == (0, 2)
+
+    # 只改修改时间：按修改时间判断时重新转换，按内容哈希判断时仍跳过
+    stat = first.stat()
+    os.utime(first, ns=(stat.st_atime_ns, stat.st_mtime_ns - 10 ** 9))
+    assert run_batch(monkeypatch, capsys, *args) == ((0, 2) if hash_mode else (1, 1))
+
+    # 内容变化：两种模式都重新转换
+    from openpyxl import load_workbook
+    workbook = load_workbook(second)
+    workbook.active['B2'] = 99
+    workbook.save(second)
+    assert run_batch(monkeypatch, capsys, *args) == (1, 1)
+    with open(tmp_path / 'out' / 'b' / '成绩.csv', encoding='utf-8') as f:
+        assert f.read().splitlines()[1] == 'b01,99'
+
+    assert run_batch(monkeypatch, capsys, *args, '--force') == (2, 0)
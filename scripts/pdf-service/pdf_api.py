@@ -3,17 +3,192 @@ PDF生成API服务
 将Markdown转换为专业的PDF报告
 """
 
-from flask import Flask, request, send_file, jsonify
+from flask import Flask, Response, g, request, send_file, jsonify
 from flask_cors import CORS
 import subprocess
 import tempfile
 import os
 import shutil
+import threading
+import time
+import base64
+import hashlib
+import io
+import json
+import sys
+from contextlib import contextmanager
 from pathlib import Path
 
+# 指标实现与 python-data-processor 共用：镜像中 metrics.py 复制在同一目录，在仓库中直接运行时从相邻目录导入
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'python-data-processor'))
+from metrics import MetricsRegistry, CONTENT_TYPE as METRICS_CONTENT_TYPE  # noqa: E402
+
 app = Flask(__name__)
 CORS(app)
 
+# 运行指标的分桶：耗时以秒计，大小以字节计
+DURATION_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+SIZE_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+# 渲染缓存目录和总大小上限（字节），上限为0时关闭缓存
+PDF_CACHE_DIR = os.environ.get('PDF_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'pdf-render-cache'))
+PDF_CACHE_MAX_BYTES = int(os.environ.get('PDF_CACHE_MAX_BYTES', 512 * 1024 * 1024))
+# 缓存键的格式版本，键的组成变化时加一
+CACHE_KEY_VERSION = 1
+
+
+# 运行指标，由 GET /metrics 输出
+metrics = MetricsRegistry()
+HTTP_REQUESTS = metrics.counter('pdf_http_requests_total', '请求数（按端点和状态码）', ['endpoint', 'status'])
+HTTP_DURATION = metrics.histogram('pdf_http_request_duration_seconds', '请求耗时（秒）', ['endpoint'], DURATION_BUCKETS)
+STAGE_DURATION = metrics.histogram('pdf_stage_duration_seconds', '各阶段耗时（秒）：写入输入文件、pdf-builder转换、pandoc预览',
+                                   ['stage'], DURATION_BUCKETS)
+MARKDOWN_SIZE = metrics.histogram('pdf_markdown_size_bytes', '提交的Markdown大小（字节）', buckets=SIZE_BUCKETS)
+OUTPUT_SIZE = metrics.histogram('pdf_output_size_bytes', '生成的PDF大小（字节）', buckets=SIZE_BUCKETS)
+CACHE_REQUESTS = metrics.counter('pdf_cache_requests_total',
+                                 '渲染缓存查询数：hit 磁盘命中、not_modified 按 If-None-Match 返回304、miss 重新渲染', ['result'])
+CACHE_EVICTIONS = metrics.counter('pdf_cache_evictions_total', '渲染缓存按最近访问时间淘汰的条目数')
+
+
+@contextmanager
+def timed_stage(name):
+    """记录一个阶段的耗时：计入指标，并通过 Server-Timing 响应头返回给调用方"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        STAGE_DURATION.observe(elapsed, stage=name)
+        g.setdefault('timings', {})[name] = elapsed
+
+
+def builder_version():
+    """pdf-builder 的版本标识，作为缓存键的一部分，升级或重装后旧的缓存不再命中
+
+    优先使用环境变量 PDF_BUILDER_VERSION，否则取 pdf-builder 可执行文件的路径、大小和修改时间。
+    """
+    override = os.environ.get('PDF_BUILDER_VERSION')
+    if override:
+        return override
+    executable = shutil.which('pdf-builder')
+    if executable is None:
+        return 'missing'
+    stat = os.stat(executable)
+    return f'{os.path.realpath(executable)}:{stat.st_size}:{stat.st_mtime_ns}'
+
+
+class RenderCache:
+    """以内容哈希为键、保存在磁盘上的PDF缓存
+
+    每个条目是 <目录>/<键前两位>/<键>.pdf。命中时刷新文件修改时间，写入后总大小超过上限时按修改时间从旧到新淘汰。
+    状态只在文件系统上，多个 gunicorn 进程可以共用同一个目录。
+    """
+
+    def __init__(self, directory, max_bytes):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+
+    @property
+    def enabled(self):
+        return self.max_bytes > 0
+
+    @staticmethod
+    def key(**fields):
+        """各字段按键排序序列化为JSON后的 SHA-256"""
+        payload = json.dumps({'version': CACHE_KEY_VERSION, **fields}, ensure_ascii=False, sort_keys=True)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _path(self, key):
+        return self.directory / key[:2] / f'{key}.pdf'
+
+    def get(self, key):
+        """命中时返回PDF内容并刷新最近访问时间，未命中返回None；不完整的条目删除后按未命中处理"""
+        if not self.enabled:
+            return None
+        path = self._path(key)
+        try:
+            data = path.read_bytes()
+        except FileNotFoundError:
+            return None
+        if not (data.startswith(b'%PDF-') and b'%%EOF' in data[-1024:]):
+            path.unlink(missing_ok=True)
+            return None
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass  # 读取后被其他进程淘汰
+        return data
+
+    def put(self, key, data):
+        """写入一个条目（先写临时文件再替换），然后淘汰到不超过上限；写入失败不影响本次请求"""
+        if not self.enabled or len(data) > self.max_bytes:
+            return
+        path = self._path(key)
+        temp_path = path.with_name(f'{path.name}.{os.getpid()}.{threading.get_ident()}.tmp')
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path.write_bytes(data)
+            os.replace(temp_path, path)
+            self._evict()
+        except OSError:
+            temp_path.unlink(missing_ok=True)
+
+    def _evict(self):
+        entries = []
+        for path in self.directory.glob('*/*.pdf'):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                continue  # 已被其他进程淘汰
+            total -= size
+            CACHE_EVICTIONS.inc()
+
+
+render_cache = RenderCache(PDF_CACHE_DIR, PDF_CACHE_MAX_BYTES)
+
+
+def pdf_response(pdf_bytes, title, cache_key, cache_status):
+    """以附件返回PDF，ETag 为缓存键，X-PDF-Cache 标明是否命中缓存"""
+    response = send_file(
+        io.BytesIO(pdf_bytes),
+        mimetype='application/pdf',
+        as_attachment=True,
+        download_name=f'{title}.pdf',
+        etag=cache_key
+    )
+    response.headers['X-PDF-Cache'] = cache_status
+    return response
+
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+
+@app.after_request
+def observe_request(response):
+    started = g.pop('request_started', None)
+    if started is not None:
+        endpoint = request.endpoint or 'unknown'
+        HTTP_REQUESTS.inc(endpoint=endpoint, status=response.status_code)
+        HTTP_DURATION.observe(time.perf_counter() - started, endpoint=endpoint)
+    timings = g.get('timings')
+    if timings:
+        response.headers['Server-Timing'] = ', '.join(
+            f'{name};dur={elapsed * 1000:.1f}' for name, elapsed in timings.items()
+        )
+    return response
+
 
 @app.route('/health', methods=['GET'])
 def health():
@@ -21,6 +196,12 @@ def health():
     return jsonify({'status': 'ok', 'service': 'pdf-builder'})
 
 
+@app.route('/metrics', methods=['GET'])
+def metrics_endpoint():
+    """Prometheus 文本格式的运行指标"""
+    return Response(metrics.render(), content_type=METRICS_CONTENT_TYPE)
+
+
 @app.route('/api/generate-pdf', methods=['POST'])
 def generate_pdf():
     """
@@ -31,8 +212,12 @@ def generate_pdf():
         "markdown": "# 报告标题\n\n内容...",
         "title": "增值评价分析报告",
         "template": "simple",  // 或 "bootcamp"
+        "subtitle": "报告",  // bootcamp 模板的副标题，可选
         "logo": "data:image/png;base64,..."  // 可选
     }
+
+    相同的内容（Markdown、标题、副标题、模板、Logo、pdf-builder 版本）直接从渲染缓存返回；
+    响应的 ETag 即缓存键，请求带匹配的 If-None-Match 时返回304。
     """
     try:
         data = request.json
@@ -43,25 +228,55 @@ def generate_pdf():
 
         if not markdown_content:
             return jsonify({'error': '缺少markdown内容'}), 400
+        MARKDOWN_SIZE.observe(len(markdown_content.encode('utf-8')))
+
+        # 解析base64的Logo（如果有）
+        logo_bytes = None
+        if logo_data:
+            if logo_data.startswith('data:image'):
+                logo_data = logo_data.split(',')[1]
+            logo_bytes = base64.b64decode(logo_data)
+
+        template = 'simple' if template == 'simple' else 'bootcamp'
+        subtitle = data.get('subtitle', '报告')
+        cache_key = RenderCache.key(
+            markdown=markdown_content,
+            title=title,
+            template=template,
+            # 副标题只在 bootcamp 模板中使用
+            subtitle=subtitle if template == 'bootcamp' else None,
+            logo=hashlib.sha256(logo_bytes).hexdigest() if logo_bytes else None,
+            builder=builder_version()
+        )
+
+        # 相同的输入渲染出相同的PDF，ETag 匹配时不需要查缓存
+        if request.if_none_match.contains(cache_key):
+            CACHE_REQUESTS.inc(result='not_modified')
+            response = Response(status=304)
+            response.set_etag(cache_key)
+            return response
+
+        with timed_stage('cache_lookup'):
+            pdf_bytes = render_cache.get(cache_key)
+        if pdf_bytes is not None:
+            CACHE_REQUESTS.inc(result='hit')
+            return pdf_response(pdf_bytes, title, cache_key, 'hit')
+        CACHE_REQUESTS.inc(result='miss')
 
         # 创建临时工作目录
         with tempfile.TemporaryDirectory() as temp_dir:
             temp_path = Path(temp_dir)
 
-            # 保存Markdown文件
-            md_file = temp_path / 'report.md'
-            md_file.write_text(markdown_content, encoding='utf-8')
+            with timed_stage('write_inputs'):
+                # 保存Markdown文件
+                md_file = temp_path / 'report.md'
+                md_file.write_text(markdown_content, encoding='utf-8')
 
-            # 保存Logo（如果有）
-            logo_file = None
-            if logo_data:
-                logo_file = temp_path / 'logo.png'
-                # 解析base64并保存
-                import base64
-                if logo_data.startswith('data:image'):
-                    logo_data = logo_data.split(',')[1]
-                logo_bytes = base64.b64decode(logo_data)
-                logo_file.write_bytes(logo_bytes)
+                # 保存Logo（如果有）
+                logo_file = None
+                if logo_bytes:
+                    logo_file = temp_path / 'logo.png'
+                    logo_file.write_bytes(logo_bytes)
 
             # 输出PDF路径
             output_pdf = temp_path / 'output.pdf'
@@ -82,19 +297,20 @@ def generate_pdf():
                     'pdf-builder', 'bootcamp',
                     '--bootcamp-title', title,
                     '--input-directory', str(temp_path),
-                    '--day-title', data.get('subtitle', '报告'),
+                    '--day-title', subtitle,
                     '--output-path', str(output_pdf)
                 ]
                 if logo_file:
                     cmd.extend(['--logo-file', str(logo_file)])
 
             # 执行转换
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=60
-            )
+            with timed_stage('render'):
+                result = subprocess.run(
+                    cmd,
+                    capture_output=True,
+                    text=True,
+                    timeout=60
+                )
 
             if result.returncode != 0:
                 return jsonify({
@@ -106,14 +322,13 @@ def generate_pdf():
             # 检查PDF是否生成
             if not output_pdf.exists():
                 return jsonify({'error': 'PDF文件未生成'}), 500
+            pdf_bytes = output_pdf.read_bytes()
+            OUTPUT_SIZE.observe(len(pdf_bytes))
 
-            # 返回PDF文件
-            return send_file(
-                str(output_pdf),
-                mimetype='application/pdf',
-                as_attachment=True,
-                download_name=f'{title}.pdf'
-            )
+            # 写入渲染缓存并返回PDF文件
+            with timed_stage('cache_store'):
+                render_cache.put(cache_key, pdf_bytes)
+            return pdf_response(pdf_bytes, title, cache_key, 'miss')
 
     except subprocess.TimeoutExpired:
         return jsonify({'error': 'PDF生成超时'}), 500
@@ -149,7 +364,8 @@ def preview():
                 '--css', 'https://cdn.jsdelivr.net/npm/github-markdown-css/github-markdown.min.css'
             ]
 
-            subprocess.run(cmd, check=True, timeout=10)
+            with timed_stage('preview'):
+                subprocess.run(cmd, check=True, timeout=10)
 
             html_content = html_file.read_text(encoding='utf-8')
 
@@ -81,13 +81,15 @@ MARKDOWN_CONTENT='# 增值评价分析报告
 2. 王五 ↔ 赵六（物理帮扶）
 '
 
-curl -X POST $API_URL/generate-pdf \
-  -H "Content-Type: application/json" \
-  -d "{
+REQUEST_BODY="{
     \"markdown\": $(echo "$MARKDOWN_CONTENT" | jq -Rs .),
     \"title\": \"测试报告\",
     \"template\": \"simple\"
-  }" \
+  }"
+
+curl -X POST $API_URL/generate-pdf \
+  -H "Content-Type: application/json" \
+  -d "$REQUEST_BODY" \
   --output test-report.pdf
 
 if [ -f "test-report.pdf" ]; then
@@ -105,6 +107,34 @@ else
     echo "❌ PDF生成失败"
     exit 1
 fi
+echo ""
+
+# 4. 渲染缓存测试：相同内容再次请求应命中缓存，带上ETag时返回304
+echo "4️⃣ 渲染缓存测试..."
+CACHE_HEADERS=$(curl -s -o /dev/null -D - -X POST $API_URL/generate-pdf \
+  -H "Content-Type: application/json" \
+  -d "$REQUEST_BODY")
+ETAG=$(echo "$CACHE_HEADERS" | grep -i "^etag:" | cut -d' ' -f2 | tr -d '\r')
+
+if echo "$CACHE_HEADERS" | grep -qi "^x-pdf-cache: hit"; then
+    echo "✅ 重复请求命中渲染缓存"
+else
+    echo "❌ 重复请求未命中渲染缓存"
+    echo "$CACHE_HEADERS"
+    exit 1
+fi
+
+NOT_MODIFIED=$(curl -s -o /dev/null -w "%{http_code}" -X POST $API_URL/generate-pdf \
+  -H "Content-Type: application/json" \
+  -H "If-None-Match: $ETAG" \
+  -d "$REQUEST_BODY")
+
+if [ "$NOT_MODIFIED" = "304" ]; then
+    echo "✅ If-None-Match 返回304"
+else
+    echo "❌ If-None-Match 返回 $NOT_MODIFIED"
+    exit 1
+fi
 
 echo ""
 echo "======================================"
@@ -0,0 +1,15 @@
+# -*- coding: utf-8 -*-
+"""
+测试公共配置
+导入 pdf_api 之前把渲染缓存指向临时目录，并固定 pdf-builder 版本标识
+"""
+
+import os
+import sys
+import tempfile
+
+TEST_DIR = tempfile.mkdtemp(prefix='pdf-tests-')
+os.environ.setdefault('PDF_CACHE_DIR', os.path.join(TEST_DIR, 'cache'))
+os.environ.setdefault('PDF_BUILDER_VERSION', 'test-builder')
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+"""GET /metrics：使用 python-data-processor 的 metrics.py，标签值按文本格式转义"""
+
+import re
+
+import pdf_api
+
+SAMPLE = re.compile(r'^[a-zA-Z_:][a-zA-Z0-9_:]*(\{([a-zA-Z_][a-zA-Z0-9_]*="(?:[^"\\\n]|\\[\\"n])*",?)*\})? \S+$')
+
+
+def test_shares_metrics_module():
+    import metrics
+    assert isinstance(pdf_api.metrics, metrics.MetricsRegistry)
+
+
+def test_metrics_output_escapes_label_values():
+    client = pdf_api.app.test_client()
+    client.get('/health')
+    pdf_api.CACHE_REQUESTS.inc(result='a\\b"c\nd')
+
+    response = client.get('/metrics')
+    assert response.status_code == 200
+    assert response.headers['Content-Type'] == pdf_api.METRICS_CONTENT_TYPE
+
+    lines = response.get_data(as_text=True).splitlines()
+    assert 'pdf_cache_requests_total{result="a\\\\b\\"c\\nd"} 1' in lines
+    assert 'pdf_http_requests_total{endpoint="health",status="200"} 1' in lines
+    for line in lines:
+        assert line.startswith('# HELP ') or line.startswith('# TYPE ') or SAMPLE.match(line), line
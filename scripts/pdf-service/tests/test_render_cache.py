@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+"""渲染缓存：缓存键的组成、If-None-Match 返回304、损坏的条目重新渲染"""
+
+import base64
+from pathlib import Path
+
+import pytest
+
+import pdf_api
+
+PDF = b'%PDF-1.7\n' + b'0' * 64 + b'\n%%EOF\n'
+LOGO = 'data:image/png;base64,' + base64.b64encode(b'logo-1').decode()
+
+
+@pytest.fixture
+def renders(monkeypatch, tmp_path):
+    """用假的 pdf-builder 渲染，返回每次调用的命令"""
+    calls = []
+
+    class Completed:
+        returncode = 0
+        stdout = stderr = ''
+
+    def run(cmd, **kwargs):
+        calls.append(cmd)
+        Path(cmd[cmd.index('--output-path') + 1]).write_bytes(PDF)
+        return Completed()
+
+    monkeypatch.setattr(pdf_api.subprocess, 'run', run)
+    monkeypatch.setattr(pdf_api, 'render_cache', pdf_api.RenderCache(tmp_path / 'cache', 1024 * 1024))
+    monkeypatch.setenv('PDF_BUILDER_VERSION', 'builder-1')
+    return calls
+
+
+def generate(headers=None, **fields):
+    payload = {'markdown': '# 报告\n\n内容', 'title': '期末分析', **fields}
+    return pdf_api.app.test_client().post('/api/generate-pdf', json=payload, headers=headers or {})
+
+
+def test_repeat_request_hits_cache(renders):
+    first = generate()
+    second = generate()
+
+    assert first.status_code == second.status_code == 200
+    assert first.headers['X-PDF-Cache'] == 'miss'
+    assert second.headers['X-PDF-Cache'] == 'hit'
+    assert second.data == PDF
+    assert first.headers['ETag'] == second.headers['ETag']
+    assert len(renders) == 1
+
+
+@pytest.mark.parametrize('base, changed', [
+    ({'template': 'simple'}, {'template': 'bootcamp'}),
+    ({'template': 'bootcamp', 'subtitle': '第一学期'}, {'template': 'bootcamp', 'subtitle': '第二学期'}),
+    ({}, {'logo': LOGO}),
+    ({'logo': LOGO}, {'logo': base64.b64encode(b'logo-2').decode()}),
+    ({'markdown': '# 一'}, {'markdown': '# 二'}),
+])
+def test_key_changes_with_inputs(renders, base, changed):
+    first = generate(**base)
+    second = generate(**changed)
+    assert second.headers['X-PDF-Cache'] == 'miss'
+    assert first.headers['ETag'] != second.headers['ETag']
+    assert len(renders) == 2
+
+
+def test_key_ignores_subtitle_for_simple_template(renders):
+    first = generate(template='simple', subtitle='第一学期')
+    second = generate(template='simple', subtitle='第二学期')
+    assert second.headers['X-PDF-Cache'] == 'hit'
+    assert first.headers['ETag'] == second.headers['ETag']
+
+
+def test_key_changes_with_builder_version(renders, monkeypatch):
+    first = generate()
+    monkeypatch.setenv('PDF_BUILDER_VERSION', 'builder-2')
+    second = generate()
+    assert second.headers['X-PDF-Cache'] == 'miss'
+    assert first.headers['ETag'] != second.headers['ETag']
+    assert len(renders) == 2
+
+
+def test_key_is_stable_and_field_order_independent():
+    key = pdf_api.RenderCache.key(markdown='a', title='b', logo=None)
+    assert key == pdf_api.RenderCache.key(logo=None, title='b', markdown='a')
+    assert key != pdf_api.RenderCache.key(markdown='a', title='b', logo='c')
+
+
+def test_if_none_match_returns_304(renders):
+    etag = generate().headers['ETag']
+    response = generate(headers={'If-None-Match': etag})
+
+    assert response.status_code == 304
+    assert response.headers['ETag'] == etag
+    assert response.data == b''
+    assert len(renders) == 1
+
+    # 内容变化后旧的 ETag 不再匹配
+    assert generate(headers={'If-None-Match': etag}, markdown='# 新内容').status_code == 200
+
+
+@pytest.mark.parametrize('corrupt', [b'', b'%PDF-1.7\ntruncated', b'not a pdf'])
+def test_corrupt_entry_is_rerendered(renders, corrupt):
+    etag = generate().headers['ETag'].strip('"')
+    entry = pdf_api.render_cache._path(etag)
+    entry.write_bytes(corrupt)
+
+    response = generate()
+    assert response.status_code == 200
+    assert response.headers['X-PDF-Cache'] == 'miss'
+    assert response.data == PDF
+    assert len(renders) == 2
+    assert entry.read_bytes() == PDF
@@ -4,11 +4,29 @@
 """
 📊 XLSX转CSV转换器
 使用标准库处理Excel文件，然后用现有的CSV分析脚本
+每个工作表转换为一个CSV；没有openpyxl时用标准库 iterparse 流式解析，边解析边写出，内存不随行数增长
+
+批量模式：参数可以是文件、目录（递归查找）或通配符，用进程池并行转换，可输出Parquet；
+转换清单记录每个文件的修改时间（--hash 时为内容哈希）和输出，重新运行时跳过未变化的文件
+
+用法: python xlsx-to-csv-converter.py <文件/目录/通配符>... [--output-dir 目录] [--format csv|parquet]
+                                     [--engine auto|openpyxl|xml] [--workers N] [--hash] [--force]
 """
 
+import os
 import sys
 import csv
+import glob
 import json
+import time
+import hashlib
+import zipfile
+import argparse
+import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from functools import partial
 from pathlib import Path
 
 # 尝试导入openpyxl，如果失败则使用xml处理
@@ -17,118 +35,461 @@ try:
     OPENPYXL_AVAILABLE = True
 except ImportError:
     OPENPYXL_AVAILABLE = False
-    import zipfile
-    import xml.etree.ElementTree as ET
 
-def convert_xlsx_to_csv_openpyxl(xlsx_path, csv_path):
-    """使用openpyxl转换XLSX到CSV"""
-    workbook = load_workbook(xlsx_path, read_only=True)
-    sheet = workbook.active
+# 输出Parquet时需要
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+MAIN_NS = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+REL_NS = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+PACKAGE_REL_NS = '{http://schemas.openxmlformats.org/package/2006/relationships}'
+
+SHEET_DATA = MAIN_NS + 'sheetData'
+DIMENSION = MAIN_NS + 'dimension'
+ROW = MAIN_NS + 'row'
+SHARED_STRING = MAIN_NS + 'si'
+TEXT = MAIN_NS + 't'
+RUN = MAIN_NS + 'r'
+VALUE = MAIN_NS + 'v'
+INLINE_STRING = MAIN_NS + 'is'
+
+# 内置的日期/时间数字格式（含中文区域设置使用的 27-36、50-58）
+BUILTIN_DATE_FORMATS = set(range(14, 23)) | set(range(27, 37)) | set(range(45, 48)) | set(range(50, 59))
+
+EXCEL_SUFFIXES = ('.xlsx', '.xlsm')
+OUTPUT_SUFFIXES = {'csv': '.csv', 'parquet': '.parquet'}
+MANIFEST_NAME = '.xlsx-convert-manifest.json'
+PARQUET_BATCH_ROWS = 65536
+HASH_BLOCK_SIZE = 1 << 20
+
+def sheet_output_path(output_path, sheet_name, sheet_count):
+    """工作表对应的输出路径：只有一个工作表时就是 output_path，否则为 文件名_工作表名.扩展名"""
+    output_path = Path(output_path)
+    if sheet_count == 1:
+        return output_path
+    safe_name = ''.join('_' if char in '\\/:*?"<>|' else char for char in sheet_name)
+    return output_path.with_name(f"{output_path.stem}_{safe_name}{output_path.suffix}")
+
+def _openpyxl_rows(sheet):
+    for row in sheet.iter_rows(values_only=True):
+        # 将None值替换为空字符串
+        yield [str(cell) if cell is not None else '' for cell in row]
+
+@contextmanager
+def open_sheets_openpyxl(xlsx_path):
+    """openpyxl read_only 打开工作簿，产出 [(工作表名, 返回行迭代器的函数)]；公式单元格取缓存的计算结果"""
+    workbook = load_workbook(xlsx_path, read_only=True, data_only=True)
+    try:
+        yield [(sheet.title, partial(_openpyxl_rows, sheet)) for sheet in workbook.worksheets]
+    finally:
+        workbook.close()
+
+def column_index(reference):
+    """单元格引用（如"AB12"）的列序号，从0开始"""
+    index = 0
+    for char in reference:
+        if not char.isalpha():
+            break
+        index = index * 26 + ord(char.upper()) - 64
+    return index - 1
+
+def _rich_text(element):
+    """共享字符串/内联字符串的文本：富文本各段 <r><t> 依次拼接，忽略注音 <rPh>"""
+    text = element.find(TEXT)
+    if text is not None:
+        return text.text or ''
+    return ''.join(run.findtext(TEXT) or '' for run in element.iter(RUN))
+
+def read_shared_strings(xlsx_zip):
+    """流式读取共享字符串表，解析完一个 <si> 就清空"""
+    shared_strings = []
+    if 'xl/sharedStrings.xml' not in xlsx_zip.namelist():
+        return shared_strings
     
-    with open(csv_path, 'w', newline='', encoding='utf-8') as csvfile:
-        writer = csv.writer(csvfile)
-        
-        for row in sheet.iter_rows(values_only=True):
-            # 将None值替换为空字符串
-            cleaned_row = [str(cell) if cell is not None else '' for cell in row]
-            writer.writerow(cleaned_row)
+    with xlsx_zip.open('xl/sharedStrings.xml') as f:
+        table = None
+        for event, element in ET.iterparse(f, events=('start', 'end')):
+            if event == 'start':
+                if table is None:
+                    table = element
+            elif element.tag == SHARED_STRING:
+                shared_strings.append(_rich_text(element))
+                table.clear()
+    return shared_strings
+
+def read_date_styles(xlsx_zip):
+    """数字格式为日期/时间的单元格样式序号"""
+    if 'xl/styles.xml' not in xlsx_zip.namelist():
+        return set()
+    
+    with xlsx_zip.open('xl/styles.xml') as f:
+        root = ET.parse(f).getroot()
+    
+    date_formats = set(BUILTIN_DATE_FORMATS)
+    for number_format in root.iter(MAIN_NS + 'numFmt'):
+        # 去掉引号内的文字和 [红色] 一类的修饰后仍含日期/时间占位符
+        code = number_format.get('formatCode', '')
+        code = ''.join(part for i, part in enumerate(code.split('"')) if i % 2 == 0)
+        code = ''.join(part.split(']')[-1] for part in code.split('['))
+        if any(char in code.lower() for char in 'ymdhs'):
+            date_formats.add(int(number_format.get('numFmtId')))
     
-    workbook.close()
-    print(f"✅ 成功转换: {xlsx_path} -> {csv_path}")
+    cell_formats = root.find(MAIN_NS + 'cellXfs')
+    if cell_formats is None:
+        return set()
+    return {i for i, xf in enumerate(cell_formats) if int(xf.get('numFmtId', 0)) in date_formats}
 
-def convert_xlsx_to_csv_xml(xlsx_path, csv_path):
-    """使用标准库XML处理转换XLSX到CSV"""
-    print("⚠️ 使用简化XML处理器，可能无法处理复杂的Excel文件")
+def list_worksheets(xlsx_zip):
+    """工作簿中的 [(工作表名, 工作表XML路径)]（按工作簿中的顺序），以及是否使用1904日期系统"""
+    with xlsx_zip.open('xl/workbook.xml') as f:
+        workbook = ET.parse(f).getroot()
+    with xlsx_zip.open('xl/_rels/workbook.xml.rels') as f:
+        targets = {rel.get('Id'): rel.get('Target') for rel in ET.parse(f).getroot().iter(PACKAGE_REL_NS + 'Relationship')}
     
-    # 基本的XML处理实现
-    with zipfile.ZipFile(xlsx_path, 'r') as xlsx_zip:
-        # 读取共享字符串
-        shared_strings = []
-        try:
-            with xlsx_zip.open('xl/sharedStrings.xml') as f:
-                root = ET.parse(f).getroot()
-                for si in root.findall('.//{http://schemas.openxmlformats.org/spreadsheetml/2006/main}si'):
-                    t = si.find('{http://schemas.openxmlformats.org/spreadsheetml/2006/main}t')
-                    if t is not None:
-                        shared_strings.append(t.text or '')
-                    else:
-                        shared_strings.append('')
-        except:
-            print("⚠️ 无法读取共享字符串")
-        
-        # 读取工作表数据
-        try:
-            with xlsx_zip.open('xl/worksheets/sheet1.xml') as f:
-                root = ET.parse(f).getroot()
-                
-                rows = []
-                for row in root.findall('.//{http://schemas.openxmlformats.org/spreadsheetml/2006/main}row'):
-                    row_data = []
-                    for cell in row.findall('{http://schemas.openxmlformats.org/spreadsheetml/2006/main}c'):
-                        value = cell.find('{http://schemas.openxmlformats.org/spreadsheetml/2006/main}v')
-                        if value is not None:
-                            # 检查是否是共享字符串
-                            t_attr = cell.get('t')
-                            if t_attr == 's' and shared_strings:
-                                try:
-                                    idx = int(value.text)
-                                    if 0 <= idx < len(shared_strings):
-                                        row_data.append(shared_strings[idx])
-                                    else:
-                                        row_data.append(value.text or '')
-                                except:
-                                    row_data.append(value.text or '')
-                            else:
-                                row_data.append(value.text or '')
-                        else:
-                            row_data.append('')
-                    rows.append(row_data)
-                
-                # 写入CSV
-                with open(csv_path, 'w', newline='', encoding='utf-8') as csvfile:
-                    writer = csv.writer(csvfile)
-                    for row in rows:
-                        writer.writerow(row)
+    sheets = []
+    for sheet in workbook.iter(MAIN_NS + 'sheet'):
+        target = targets.get(sheet.get(REL_NS + 'id'), '')
+        path = target.lstrip('/') if target.startswith('/') else f'xl/{target}'
+        if path in xlsx_zip.namelist():
+            sheets.append((sheet.get('name'), path))
+    
+    properties = workbook.find(MAIN_NS + 'workbookPr')
+    date1904 = properties is not None and properties.get('date1904') in ('1', 'true')
+    return sheets, date1904
+
+def excel_datetime(serial, epoch):
+    """Excel日期序号转为 datetime（小于1时为 time），精确到毫秒，与openpyxl一致"""
+    day, fraction = divmod(serial, 1)
+    diff = timedelta(milliseconds=round(fraction * 86400 * 1000))
+    if 0 <= serial < 1 and diff.days == 0:
+        return (datetime.min + diff).time()
+    if 0 < serial < 60 and epoch.year == 1899:
+        day += 1  # 1900日期系统中不存在的1900-02-29
+    return epoch + timedelta(days=day) + diff
+
+def _cell_value(cell, shared_strings, date_styles, epoch):
+    """单元格的文本，与openpyxl读出的值转为字符串后一致"""
+    kind = cell.get('t', 'n')
+    if kind == 'inlineStr':
+        inline = cell.find(INLINE_STRING)
+        return _rich_text(inline) if inline is not None else ''
+    
+    value = cell.findtext(VALUE)
+    if value is None:
+        return ''
+    if kind == 's':
+        return shared_strings[int(value)]
+    if kind == 'b':
+        return 'True' if value == '1' else 'False'
+    if kind != 'n':
+        return value  # 公式结果字符串（str）、错误值（e）
+    
+    style = cell.get('s')
+    if style is not None and int(style) in date_styles:
+        return str(excel_datetime(float(value), epoch))
+    if '.' in value or 'E' in value or 'e' in value:
+        return str(float(value))
+    return value
+
+def iter_sheet_rows(xlsx_zip, path, shared_strings, date_styles, epoch):
+    """iterparse 逐行产出工作表的单元格文本
+
+    单元格按引用 r 放入对应的列，缺失的行和列补空；每行补齐到 <dimension> 记录的宽度
+    （没有时补齐到已读行中最宽的一行）。每产出一行就清空已解析的元素，内存占用不随行数增长。
+    """
+    width = 0
+    next_row = 1
+    sheet_data = None
+    with xlsx_zip.open(path) as f:
+        for event, element in ET.iterparse(f, events=('start', 'end')):
+            if event == 'start':
+                if element.tag == SHEET_DATA:
+                    sheet_data = element
+                continue
+            
+            if element.tag == DIMENSION:
+                width = column_index(element.get('ref', 'A1').split(':')[-1]) + 1
+            elif element.tag == ROW:
+                row_number = int(element.get('r', next_row))
+                while next_row < row_number:
+                    yield [''] * width
+                    next_row += 1
                 
-                print(f"✅ 成功转换: {xlsx_path} -> {csv_path}")
+                values = []
+                for cell in element:
+                    reference = cell.get('r')
+                    column = column_index(reference) if reference else len(values)
+                    if column < len(values):
+                        continue
+                    values.extend([''] * (column - len(values)))
+                    values.append(_cell_value(cell, shared_strings, date_styles, epoch))
                 
-        except Exception as e:
-            print(f"❌ 转换失败: {e}")
-            return False
+                width = max(width, len(values))
+                values.extend([''] * (width - len(values)))
+                yield values
+                next_row = row_number + 1
+                sheet_data.clear()
+
+@contextmanager
+def open_sheets_xml(xlsx_path):
+    """标准库 zipfile + iterparse 打开工作簿，产出 [(工作表名, 返回行迭代器的函数)]"""
+    with zipfile.ZipFile(xlsx_path, 'r') as xlsx_zip:
+        sheets, date1904 = list_worksheets(xlsx_zip)
+        shared_strings = read_shared_strings(xlsx_zip)
+        date_styles = read_date_styles(xlsx_zip)
+        epoch = datetime(1904, 1, 1) if date1904 else datetime(1899, 12, 30)
+        yield [(name, partial(iter_sheet_rows, xlsx_zip, path, shared_strings, date_styles, epoch))
+               for name, path in sheets]
+
+def write_csv(path, rows):
+    """逐行写出CSV，返回行数"""
+    count = 0
+    with open(path, 'w', newline='', encoding='utf-8') as csvfile:
+        writer = csv.writer(csvfile)
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+    return count
+
+def _parquet_columns(header):
+    """首行作为列名：空白列名记为"列N"，重复列名加序号"""
+    columns, seen = [], {}
+    for i, name in enumerate(header):
+        name = name.strip() or f'列{i + 1}'
+        if name in seen:
+            seen[name] += 1
+            name = f'{name}_{seen[name]}'
+        seen.setdefault(name, 0)
+        columns.append(name)
+    return columns
+
+def write_parquet(path, rows):
+    """首行作为列名，其余行按 PARQUET_BATCH_ROWS 分批写出Parquet（各列为字符串，空单元格为null），返回行数"""
+    rows = iter(rows)
+    header = next(rows, None)
+    if header is None:
+        pq.write_table(pa.table({}), path)
+        return 0
     
-    return True
+    columns = _parquet_columns(header)
+    schema = pa.schema([(name, pa.string()) for name in columns])
+    count = 1
+    with pq.ParquetWriter(path, schema) as writer:
+        while True:
+            batch = [row for _, row in zip(range(PARQUET_BATCH_ROWS), rows)]
+            if not batch:
+                break
+            for offset, row in enumerate(batch):
+                if len(row) > len(columns) and any(row[len(columns):]):
+                    raise ValueError(f"第{count + offset + 1}行有 {len(row)} 列，超出表头的 {len(columns)} 列")
+            arrays = [pa.array([row[i] or None if i < len(row) else None for row in batch], pa.string())
+                      for i in range(len(columns))]
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+            count += len(batch)
+    return count
+
+SHEET_OPENERS = {'openpyxl': open_sheets_openpyxl, 'xml': open_sheets_xml}
+WRITERS = {'csv': write_csv, 'parquet': write_parquet}
+
+def convert_workbook(xlsx_path, output_path, engine='openpyxl', output_format='csv'):
+    """把工作簿的每个工作表写为一个输出文件，返回 [(输出路径, 行数)]"""
+    writer = WRITERS[output_format]
+    outputs = []
+    with SHEET_OPENERS[engine](xlsx_path) as sheets:
+        for name, rows in sheets:
+            sheet_path = sheet_output_path(output_path, name, len(sheets))
+            outputs.append((sheet_path, writer(sheet_path, rows())))
+    return outputs
+
+def is_excel_file(path):
+    # 跳过Excel打开文件时生成的 ~$ 锁文件
+    return path.is_file() and path.suffix.lower() in EXCEL_SUFFIXES and not path.name.startswith('~$')
+
+def glob_root(pattern):
+    """通配符中第一个含通配字符的部分之前的目录，匹配到的文件相对于它保留子目录结构"""
+    parts = Path(pattern).parts
+    literal = []
+    for part in parts[:-1]:
+        if glob.has_magic(part):
+            break
+        literal.append(part)
+    return Path(*literal) if literal else Path('.')
+
+def discover_inputs(arguments):
+    """展开命令行中的文件、目录（递归查找）和通配符，返回 [(文件, 相对于输出目录的路径)]"""
+    found = {}
+    for argument in arguments:
+        path = Path(argument)
+        if path.is_dir():
+            for file in sorted(path.rglob('*')):
+                if is_excel_file(file):
+                    found.setdefault(file.resolve(), file.relative_to(path))
+        elif path.is_file():
+            if path.suffix.lower() not in EXCEL_SUFFIXES:
+                print(f"❌ 不支持的文件格式: {path}")
+                continue
+            found.setdefault(path.resolve(), Path(path.name))
+        else:
+            matches = [Path(match) for match in sorted(glob.glob(argument, recursive=True))]
+            matches = [match for match in matches if is_excel_file(match)]
+            if not matches:
+                print(f"❌ 文件不存在: {argument}")
+            root = glob_root(argument)
+            for match in matches:
+                found.setdefault(match.resolve(), match.relative_to(root))
+    return list(found.items())
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def load_manifest(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_manifest(path, manifest):
+    """先写临时文件再替换，中断时不会留下不完整的清单"""
+    temp_path = Path(f'{path}.tmp')
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(temp_path, path)
+
+def is_up_to_date(entry, stat, settings, digest=None):
+    """清单中记录的输出都存在、设置相同，且输入未变化（修改时间和大小；--hash 时比较内容哈希 digest）"""
+    if not entry or entry.get('settings') != settings:
+        return False
+    try:
+        output_mtimes = [os.stat(output).st_mtime_ns for output in entry['outputs']]
+    except OSError:
+        return False
+    if digest is not None:
+        return entry.get('sha256') == digest
+    return entry.get('size') == stat.st_size and entry.get('mtime_ns') == stat.st_mtime_ns \
+        and min(output_mtimes, default=stat.st_mtime_ns) >= stat.st_mtime_ns
+
+def convert_task(source, output_path, engine, output_format):
+    """进程池中转换一个文件，异常作为结果返回"""
+    start = time.perf_counter()
+    try:
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        outputs = convert_workbook(source, output_path, engine, output_format)
+    except Exception as e:
+        return {'error': str(e), 'seconds': time.perf_counter() - start}
+    return {
+        'outputs': [str(path) for path, _ in outputs],
+        'rows': sum(rows for _, rows in outputs),
+        'seconds': time.perf_counter() - start
+    }
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='XLSX转CSV/Parquet转换器')
+    parser.add_argument('inputs', nargs='+', help='XLSX文件、目录（递归查找）或通配符')
+    parser.add_argument('--output-dir', help='输出目录（目录参数下的子目录结构会保留），默认写在输入文件旁')
+    parser.add_argument('--format', choices=list(OUTPUT_SUFFIXES), default='csv', help='输出格式')
+    parser.add_argument('--engine', choices=['auto', 'openpyxl', 'xml'], default='auto',
+                        help='auto：有openpyxl时使用openpyxl，否则使用标准库XML')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='并行进程数，1为串行')
+    parser.add_argument('--manifest', help=f'转换清单路径，默认为输出目录（未指定时为当前目录）下的 {MANIFEST_NAME}')
+    parser.add_argument('--hash', action='store_true', help='按内容哈希而不是修改时间判断文件是否变化')
+    parser.add_argument('--force', action='store_true', help='忽略清单，全部重新转换')
+    return parser.parse_args(argv)
 
 def main():
-    if len(sys.argv) != 2:
-        print("❌ 使用方法: python xlsx-to-csv-converter.py <xlsx文件路径>")
-        sys.exit(1)
-    
-    xlsx_path = Path(sys.argv[1])
+    args = parse_args()
     
-    if not xlsx_path.exists():
-        print(f"❌ 文件不存在: {xlsx_path}")
+    engine = args.engine
+    if engine == 'auto':
+        engine = 'openpyxl' if OPENPYXL_AVAILABLE else 'xml'
+    if engine == 'openpyxl' and not OPENPYXL_AVAILABLE:
+        print("❌ 未安装openpyxl，请使用 --engine xml")
+        sys.exit(1)
+    if args.format == 'parquet' and not PYARROW_AVAILABLE:
+        print("❌ 输出Parquet需要安装pyarrow")
         sys.exit(1)
     
-    if xlsx_path.suffix.lower() not in ['.xlsx', '.xls']:
-        print(f"❌ 不支持的文件格式: {xlsx_path.suffix}")
+    inputs = discover_inputs(args.inputs)
+    if not inputs:
+        print("❌ 没有找到需要转换的XLSX文件")
         sys.exit(1)
     
-    # 生成CSV文件路径
-    csv_path = xlsx_path.with_suffix('.csv')
+    output_dir = Path(args.output_dir).resolve() if args.output_dir else None
+    manifest_path = Path(args.manifest) if args.manifest else (output_dir or Path.cwd()) / MANIFEST_NAME
+    manifest = load_manifest(manifest_path)
+    settings = {'engine': engine, 'format': args.format, 'output_dir': str(output_dir) if output_dir else None}
+    suffix = OUTPUT_SUFFIXES[args.format]
     
-    print(f"📊 开始转换: {xlsx_path}")
-    print(f"📁 目标文件: {csv_path}")
+    print(f"🔧 使用{'openpyxl' if engine == 'openpyxl' else '标准库XML'}转换器，输出{args.format.upper()}")
+    print("⚠️ 公式单元格输出缓存的计算结果（未经Excel重新计算保存的文件中为空）")
     
-    # 选择转换方法
-    if OPENPYXL_AVAILABLE:
-        print("🔧 使用openpyxl转换器")
-        convert_xlsx_to_csv_openpyxl(xlsx_path, csv_path)
+    start = time.perf_counter()
+    pending, skipped, conflicts, claimed = [], 0, 0, {}
+    for source, relative in inputs:
+        stat = source.stat()
+        digest = file_hash(source) if args.hash else None
+        if not args.force and is_up_to_date(manifest.get(str(source)), stat, settings, digest):
+            skipped += 1
+            continue
+        output_path = (output_dir / relative if output_dir else source).with_suffix(suffix)
+        if output_path in claimed:
+            print(f"❌ 输出路径冲突: {source} 与 {claimed[output_path]} 都会写入 {output_path}，已跳过")
+            conflicts += 1
+            continue
+        claimed[output_path] = source
+        pending.append((source, stat, digest, output_path))
+    
+    if pending:
+        print(f"📊 开始转换: {len(pending)} 个文件（跳过未变化的 {skipped} 个），{min(args.workers, len(pending))} 个进程")
+    
+    tasks = [(source, output_path, engine, args.format) for source, _, _, output_path in pending]
+    if args.workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=min(args.workers, len(tasks))) as executor:
+            results = list(executor.map(convert_task, *zip(*tasks)))
     else:
-        print("🔧 使用标准库XML转换器")
-        convert_xlsx_to_csv_xml(xlsx_path, csv_path)
+        results = [convert_task(*task) for task in tasks]
+    
+    converted = rows = 0
+    failed = conflicts
+    input_bytes = 0
+    for (source, stat, digest, _), result in zip(pending, results):
+        if 'error' in result:
+            failed += 1
+            manifest.pop(str(source), None)
+            print(f"❌ 转换失败: {source}: {result['error']}")
+            continue
+        converted += 1
+        rows += result['rows']
+        input_bytes += stat.st_size
+        manifest[str(source)] = {
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'sha256': digest,
+            'settings': settings,
+            'outputs': result['outputs']
+        }
+        print(f"✅ {source} -> {', '.join(result['outputs'])}（{result['rows']} 行，{result['seconds']:.2f}s）")
     
-    print(f"✅ 转换完成: {csv_path}")
-    print(f"💡 现在可以使用CSV分析脚本分析转换后的文件")
+    if converted or failed:
+        manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        save_manifest(manifest_path, manifest)
+    
+    elapsed = time.perf_counter() - start
+    print(f"📈 转换 {converted} 个，跳过 {skipped} 个，失败 {failed} 个，耗时 {elapsed:.2f}s")
+    if converted:
+        print(f"   吞吐量: {converted / elapsed:.1f} 文件/秒，{input_bytes / 1e6 / elapsed:.1f} MB/秒，{rows / elapsed:.0f} 行/秒")
+        print(f"💡 现在可以使用CSV分析脚本分析转换后的文件")
+    
+    if failed:
+        sys.exit(1)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -19,6 +19,15 @@ export interface ProcessedDataRecord {
   user_id?: string; // 添加用户ID字段
 }
 
+// 同一验证规则的汇总：命中记录数及前若干个记录序号（从1开始）
+export interface ValidationDetail {
+  rule: "missing_field" | "duplicate_record";
+  field?: string;
+  fields?: string[];
+  count: number;
+  rows: number[];
+}
+
 export interface ProcessingReport {
   file_info: {
     filename: string;
@@ -37,6 +46,8 @@ export interface ProcessingReport {
     valid: boolean;
     errors: string[];
     warnings: string[];
+    error_details?: ValidationDetail[];
+    warning_details?: ValidationDetail[];
     total_records: number;
     unique_students: number;
   };